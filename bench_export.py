@@ -0,0 +1,65 @@
+"""
+Todoist MCP — export / import throughput benchmark.
+Exports a synthetic account from the local fake API used by load_test.py and
+imports it back, reporting records/s, upstream requests and peak traced memory.
+Usage: python bench_export.py [--tasks 20000] [--comment-every 7] [--api-latency 0]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# Allow running directly from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+
+from load_test import FakeTodoist, serve
+
+
+def _measure(fake: FakeTodoist, fn, *args):
+    """Run fn, returning (result, seconds, upstream requests, peak traced MB)."""
+    before = sum(fake.requests.values())
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, sum(fake.requests.values()) - before, peak / 1e6
+
+
+def run(tasks: int, comment_every: int, latency_ms: float):
+    fake = FakeTodoist(tasks, latency_ms / 1000)
+    for i, task_id in enumerate(list(fake.tasks)):
+        if comment_every and i % comment_every == 0:
+            fake.comments[f"c{i}"] = {"id": f"c{i}", "task_id": task_id, "content": f"note {i}"}
+    httpd = serve(fake)
+    os.environ["TODOIST_API_BASE_URL"] = f"http://127.0.0.1:{httpd.server_port}/api/v1"
+    os.environ.setdefault("TODOIST_API_TOKEN", "bench")
+    os.environ["TODOIST_MCP_STATE_DIR"] = tempfile.mkdtemp(prefix="todoist-mcp-bench-")
+    from todoist_mcp.server import _export_account, _import_account
+
+    path = os.path.join(os.environ["TODOIST_MCP_STATE_DIR"], "bench.jsonl.gz")
+    counts, seconds, requests, peak = _measure(fake, _export_account, path)
+    total = sum(counts.values())
+    print(f"{'step':<8} {'records':>8} {'records/s':>10} {'requests':>9} {'peak MB':>8}")
+    print(f"{'export':<8} {total:>8} {total / seconds:>10.0f} {requests:>9} {peak:>8.1f}"
+          f"   ({os.path.getsize(path) / 1e6:.2f} MB file)")
+    (counts, failed), seconds, requests, peak = _measure(fake, _import_account, path)
+    total = sum(counts.values())
+    print(f"{'import':<8} {total:>8} {total / seconds:>10.0f} {requests:>9} {peak:>8.1f}"
+          + (f"   ({failed} failed)" if failed else ""))
+    print("\nPeak memory is traced across all threads, so import includes the objects the fake API creates.")
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20000, help="active tasks in the fake account")
+    parser.add_argument("--comment-every", type=int, default=7, help="give every Nth task a comment (0 = none)")
+    parser.add_argument("--api-latency", type=float, default=0, help="simulated upstream latency in ms")
+    args = parser.parse_args()
+    run(args.tasks, args.comment_every, args.api_latency)
@@ -0,0 +1,99 @@
+"""
+Todoist MCP — JSON decoding microbenchmark.
+Compares decode time per MB of synthetic /tasks pages for the stdlib decoder,
+orjson (if installed) and the incremental parser used for streamed responses.
+Usage: python bench_json.py [--mb 1 5 20] [--repeat 5]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+# Allow running directly from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+
+from todoist_mcp.server import STREAM_CHUNK, _iter_json_arrays
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _synthetic_page(target_mb: float) -> bytes:
+    """Build a /tasks-shaped page of roughly target_mb megabytes."""
+    rng = random.Random(42)
+    words = "review plan draft call email fix ship write read buy book pay clean update 会议 报告 🎯".split()
+    tasks = []
+    size = 0
+    while size < target_mb * 1_000_000:
+        i = len(tasks)
+        task = {
+            "id": f"6X{i:014d}",
+            "project_id": f"6Y{rng.randrange(50):014d}",
+            "section_id": None,
+            "parent_id": None,
+            "content": " ".join(rng.choices(words, k=rng.randint(2, 8))),
+            "description": " ".join(rng.choices(words, k=rng.randint(0, 30))),
+            "priority": rng.randint(1, 4),
+            "labels": rng.sample(["work", "home", "urgent", "errand"], k=rng.randint(0, 2)),
+            "due": {"date": "2026-10-20", "string": "tomorrow", "lang": "en", "is_recurring": False},
+            "deadline": None,
+            "checked": False,
+            "is_deleted": False,
+            "added_at": "2026-10-01T08:30:00.000000Z",
+            "note_count": rng.randint(0, 3),
+            "child_order": i,
+        }
+        tasks.append(task)
+        size += len(json.dumps(task))
+    return json.dumps({"results": tasks, "next_cursor": "next"}, ensure_ascii=False).encode()
+
+
+def _bench(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _stream(raw: bytes):
+    chunks = (raw[i:i + STREAM_CHUNK] for i in range(0, len(raw), STREAM_CHUNK))
+    return [item for _, item in _iter_json_arrays(chunks, {"results"}, {})]
+
+
+def _first_item(raw: bytes):
+    chunks = (raw[i:i + STREAM_CHUNK] for i in range(0, len(raw), STREAM_CHUNK))
+    return next(_iter_json_arrays(chunks, {"results"}, {}))
+
+
+def run(sizes: list, repeat: int):
+    print(f"{'payload':>10}  {'decoder':<22} {'ms/MB':>8} {'total ms':>9}")
+    for mb in sizes:
+        raw = _synthetic_page(mb)
+        real_mb = len(raw) / 1_000_000
+        count = len(json.loads(raw)["results"])
+        assert len(_stream(raw)) == count
+        cases = [("json (stdlib)", lambda: json.loads(raw))]
+        if orjson:
+            cases.append(("orjson", lambda: orjson.loads(raw)))
+        cases.append((f"incremental ({STREAM_CHUNK // 1024}KB)", lambda: _stream(raw)))
+        cases.append(("incremental: 1st item", lambda: _first_item(raw)))
+        for name, fn in cases:
+            t = _bench(fn, repeat)
+            print(f"{real_mb:>8.1f}MB  {name:<22} {t * 1000 / real_mb:>8.1f} {t * 1000:>9.1f}")
+        print(f"{'':>10}  ({count} tasks)")
+    if not orjson:
+        print("\norjson is not installed — pip install 'todoist-mcp-helper[fast]' to compare.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 5, 20], help="payload sizes in MB")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (best is reported)")
+    args = parser.parse_args()
+    run(args.mb, args.repeat)
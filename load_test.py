@@ -0,0 +1,573 @@
+"""
+Todoist MCP — load & soak test.
+Drives the real MCP tools through in-memory client sessions (one per simulated
+agent) against a local fake Todoist API, and reports throughput, latency
+percentiles, memory growth and upstream request amplification.
+Usage: python load_test.py [--agents 8] [--rate 40] [--duration 60] [--mix read=30,search=20,list=30,mutate=20]
+Soak:  python load_test.py --duration 14400 --report-every 300
+"""
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+import threading
+import tracemalloc
+from collections import Counter, deque
+from datetime import date, timedelta
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Allow running directly from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+
+WORDS = (
+    "review plan draft call email fix ship write read buy book pay clean update "
+    "budget report invoice meeting groceries dentist release backlog 会议 报告"
+).split()
+PAGE_SIZE = 200  # same page size as the real API, so bulk reads exercise the cursor loop
+
+
+# ═══════════════════════════════════════════════
+#  Fake Todoist API
+# ═══════════════════════════════════════════════
+
+class FakeTodoist:
+    """In-memory Todoist account served over HTTP; counts every upstream request."""
+
+    def __init__(self, tasks: int, latency: float, seed: int = 0):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.next_id = 0
+        self.projects = {"inbox": {"id": "inbox", "name": "Inbox", "inbox_project": True}}
+        for i in range(10):
+            self.projects[f"p{i}"] = {"id": f"p{i}", "name": f"Project {i}"}
+        self.sections = {f"s{i}": {"id": f"s{i}", "name": f"Section {i}", "project_id": f"p{i % 10}"} for i in range(20)}
+        self.labels = {f"l{i}": {"id": f"l{i}", "name": w} for i, w in enumerate(["work", "home", "urgent", "errand"])}
+        self.comments: dict = {}
+        self.tasks: dict = {}
+        self.timezone = ""  # account timezone returned by a "user" sync read; unset = no user resource
+        self.version = 0  # sync tokens are versions; reads with a token below oldest_token get a full sync
+        self.oldest_token = 0
+        self.changes: dict = {}  # (resource type, id) -> (version, object as a sync read reports it)
+        today = date.today()
+        for i in range(tasks):
+            t = self._add_task({
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))) + f" #{i}",
+                "project_id": f"p{i % 10}",
+                "priority": rng.randint(1, 4),
+                "labels": rng.sample(["work", "home", "urgent", "errand"], k=rng.randint(0, 2)),
+            })
+            if rng.random() < 0.5:
+                day = today + timedelta(days=rng.randint(-5, 14))
+                t["due"] = {"date": day.isoformat(), "string": day.isoformat(), "is_recurring": False}
+            if i % 5:
+                # Every fifth task is a root with the next four as its subtasks.
+                t["parent_id"] = f"t{i - i % 5}"
+
+    def _add_task(self, body: dict) -> dict:
+        task_id = f"t{self.next_id}"
+        self.next_id += 1
+        task = {
+            "id": task_id, "content": "", "description": "", "project_id": "inbox", "section_id": None,
+            "parent_id": None, "priority": 1, "labels": [], "due": None, "deadline": None,
+            "child_order": self.next_id, "note_count": 0, "added_at": "2026-10-01T08:30:00.000000Z",
+        }
+        task.update({k: v for k, v in body.items() if k in task})
+        if body.get("due_string"):
+            task["due"] = {"date": date.today().isoformat(), "string": body["due_string"], "is_recurring": False}
+        self.tasks[task_id] = task
+        self._changed("items", task)
+        return task
+
+    def _changed(self, resource: str, obj: dict, **flags) -> None:
+        """Record a change for incremental sync reads (flags: checked / is_deleted for removed objects)."""
+        self.version += 1
+        self.changes[(resource, obj["id"])] = (self.version, dict(obj, **flags) if flags else obj)
+
+    def _remove_tree(self, task_id: str, flag: str) -> None:
+        for sub in self._subtree(task_id):
+            self._changed("items", self.tasks.pop(sub), **{flag: True})
+
+    @staticmethod
+    def _note_resource(comment: dict) -> str:
+        return "notes" if comment.get("item_id") or comment.get("task_id") else "project_notes"
+
+    def _sync_read(self, token: str, resources: list) -> dict:
+        """Resources as a sync read returns them: everything for '*' or an expired token, else the delta."""
+        full = not token.isdigit() or int(token) < self.oldest_token
+        data: dict = {"sync_token": str(self.version), "full_sync": full}
+        for resource in resources:
+            if not full:
+                data[resource] = [obj for (r, _), (v, obj) in self.changes.items() if r == resource and v > int(token)]
+            elif resource == "items":
+                data[resource] = list(self.tasks.values())
+            elif resource == "projects":
+                data[resource] = list(self.projects.values())
+            elif resource in ("notes", "project_notes"):
+                data[resource] = [{("item_id" if k == "task_id" else k): v for k, v in c.items()}
+                                  for c in self.comments.values() if self._note_resource(c) == resource]
+        if "user" in resources and self.timezone:
+            data["user"] = {"tz_info": {"timezone": self.timezone}}
+        return data
+
+    def _subtree(self, task_id: str) -> list:
+        ids, frontier = [task_id], [task_id]
+        while frontier:
+            frontier = [t["id"] for t in self.tasks.values() if t.get("parent_id") in frontier]
+            ids.extend(frontier)
+        return ids
+
+    def handle(self, method: str, path: str, query: dict, body: dict) -> tuple[int, object]:
+        """Serve one request; returns (status, JSON body or None)."""
+        parts = path.strip("/").split("/")
+        q = {k: v[0] for k, v in query.items()}
+        with self.lock:
+            if method == "GET" and len(parts) == 1:
+                items = {"projects": self.projects, "sections": self.sections, "labels": self.labels,
+                         "tasks": self.tasks, "comments": self.comments}.get(parts[0])
+                if items is None:
+                    return 404, None
+                items = [x for x in items.values()
+                         if all(x.get(k) == q[k] for k in ("project_id", "task_id") if k in q)
+                         and ("label" not in q or q["label"] in x.get("labels", []))]
+                start = int(q.get("cursor") or 0)
+                end = start + PAGE_SIZE
+                return 200, {"results": items[start:end], "next_cursor": str(end) if end < len(items) else None}
+            if parts[0] == "tasks" and len(parts) >= 2:
+                task = self.tasks.get(parts[1])
+                if task is None:
+                    return 404, None
+                if method == "GET":
+                    return 200, task
+                if method == "DELETE" or parts[-1] == "close":
+                    self._remove_tree(parts[1], "is_deleted" if method == "DELETE" else "checked")
+                    return 204, None
+                task.update({k: v for k, v in body.items() if k in task})
+                self._changed("items", task)
+                return 200, task
+            if method == "POST" and parts == ["tasks"]:
+                return 200, self._add_task(body)
+            if method == "POST" and parts == ["sync"]:
+                status, mapping = {}, {}
+                for cmd in body.get("commands", []):
+                    args = {k: mapping.get(v, v) if isinstance(v, str) else v for k, v in cmd.get("args", {}).items()}
+                    task_id = str(args.get("id", ""))
+                    store = {"project_add": self.projects, "section_add": self.sections,
+                             "label_add": self.labels, "note_add": self.comments}.get(cmd["type"])
+                    if cmd["type"] == "item_add":
+                        mapping[cmd["temp_id"]] = self._add_task(args)["id"]
+                    elif store is not None:
+                        new_id = f"x{self.next_id}"
+                        self.next_id += 1
+                        obj = store[new_id] = dict(args, id=new_id)
+                        mapping[cmd["temp_id"]] = new_id
+                        resource = {"project_add": "projects", "section_add": "sections", "label_add": "labels"}
+                        self._changed(resource.get(cmd["type"]) or self._note_resource(obj), obj)
+                    elif cmd["type"] in ("item_close", "item_delete") and task_id in self.tasks:
+                        self._remove_tree(task_id, "checked" if cmd["type"] == "item_close" else "is_deleted")
+                    elif cmd["type"] == "item_move" and task_id in self.tasks:
+                        self.tasks[task_id].update(args)
+                        self._changed("items", self.tasks[task_id])
+                    status[cmd["uuid"]] = "ok"
+                if body.get("commands"):
+                    return 200, {"sync_status": status, "temp_id_mapping": mapping}
+                return 200, self._sync_read(str(body.get("sync_token", "*")), body.get("resource_types", []))
+            return 404, None
+
+
+def _endpoint(method: str, path: str) -> str:
+    return f"{method} " + re.sub(r"/t\d+", "/{id}", path)
+
+
+def serve(fake: FakeTodoist) -> ThreadingHTTPServer:
+    """Start the fake API on a free localhost port, in a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self):
+            url = urlparse(self.path)
+            path = url.path.removeprefix("/api/v1")
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else {}
+            with fake.lock:
+                fake.requests[_endpoint(self.command, path)] += 1
+            if fake.latency:
+                time.sleep(fake.latency)
+            status, data = fake.handle(self.command, path, parse_qs(url.query), body)
+            payload = json.dumps(data).encode() if data is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_DELETE = _reply
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024  # the default backlog of 5 drops connections under load → 1 s SYN retries
+
+    httpd = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+# ═══════════════════════════════════════════════
+#  Measurement
+# ═══════════════════════════════════════════════
+
+class Histogram:
+    """Fixed-size log-bucketed latency histogram (≈5% resolution), so hours of samples cost no memory."""
+
+    BASE = 1.05
+    MIN = 1e-4  # seconds
+
+    def __init__(self):
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.errors = 0
+        self.queued = 0  # writes the server accepted into its outbox instead of delivering
+        self.max = 0.0
+
+    def add(self, seconds: float, outcome: str = "ok") -> None:
+        self.buckets[max(0, int(math.log(max(seconds, self.MIN) / self.MIN, self.BASE)))] += 1
+        self.count += 1
+        self.errors += outcome == "error"
+        self.queued += outcome == "queued"
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram") -> None:
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.errors += other.errors
+        self.queued += other.queued
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.MIN * self.BASE ** (bucket + 1), self.max)
+        return self.max
+
+
+class Recorder:
+    """Per-tool latency histograms for the whole run, plus one for the current report interval."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tools: dict = {}
+        self.interval = Histogram()
+
+    def add(self, tool: str, seconds: float, outcome: str) -> None:
+        with self.lock:
+            self.tools.setdefault(tool, Histogram()).add(seconds, outcome)
+            self.interval.add(seconds, outcome)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.tools.clear()
+            self.interval = Histogram()
+
+    def take_interval(self) -> Histogram:
+        with self.lock:
+            h, self.interval = self.interval, Histogram()
+            return h
+
+    def total(self) -> Histogram:
+        h = Histogram()
+        with self.lock:
+            for t in self.tools.values():
+                h.merge(t)
+        return h
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), falling back to peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def slope_per_hour(samples: list) -> float:
+    """Least-squares slope of (seconds, MB) samples, in MB/hour."""
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mx = sum(x for x, _ in samples) / n
+    my = sum(y for _, y in samples) / n
+    var = sum((x - mx) ** 2 for x, _ in samples)
+    return sum((x - mx) * (y - my) for x, y in samples) / var * 3600 if var else 0.0
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms"
+
+
+# ═══════════════════════════════════════════════
+#  Synthetic Agents
+# ═══════════════════════════════════════════════
+
+MIX_CATEGORIES = ("read", "search", "list", "mutate")
+
+
+class Agent:
+    """One simulated agent session: picks the next tool call from the configured mix."""
+
+    def __init__(self, index: int, fake: FakeTodoist, mix: dict, seed: int):
+        self.index = index
+        self.fake = fake
+        self.rng = random.Random(seed * 1000 + index)
+        self.categories = list(mix)
+        self.weights = [mix[c] for c in self.categories]
+        self.created: deque = deque()
+        self.seq = 0
+
+    def _task_id(self) -> str:
+        with self.fake.lock:
+            ids = list(self.fake.tasks) if self.fake.tasks else ["t0"]
+        return self.rng.choice(ids)
+
+    def _project(self) -> str:
+        return f"Project {self.rng.randrange(10)}"
+
+    def next_call(self) -> tuple[str, dict]:
+        rng = self.rng
+        kind = rng.choices(self.categories, self.weights)[0]
+        if kind == "read":
+            return rng.choice([
+                ("get_task", {"task_id": self._task_id()}),
+                ("get_task_tree", {"task_id": self._task_id()}),
+                ("get_agenda", {"view": rng.choice(["today", "overdue", "upcoming"])}),
+            ])
+        if kind == "search":
+            return "search_task_by_name", {"query": rng.choice(WORDS)}
+        if kind == "list":
+            return rng.choice([
+                ("list_projects", {}),
+                ("list_labels", {}),
+                ("list_sections", {}),
+                ("get_tasks", {"project": self._project()}),
+            ])
+        # Mutations work on this agent's own tasks, so the account stays the same size
+        # over a soak run and name lookups are unambiguous across agents.
+        if len(self.created) < 3 or (len(self.created) < 10 and rng.random() < 0.4):
+            self.seq += 1
+            name = f"load agent{self.index} item{self.seq} {rng.choice(WORDS)}"
+            self.created.append(name)
+            return "create_task", {"content": name, "project": self._project(), "due_string": "today"}
+        name = self.created[0]
+        if rng.random() < 0.5:
+            return "update_task_by_name", {"task_name": name, "priority": rng.randint(1, 4)}
+        self.created.popleft()
+        return rng.choice(["complete_task_by_name", "delete_task_by_name"]), {"task_name": name}
+
+
+def _outcome(server, result) -> str:
+    """Classify a tool result as error / queued (accepted into the outbox, not yet delivered) / ok."""
+    text = result.content[0].text if result.content else ""
+    if result.isError or text.startswith(server._FAILURE_PREFIXES):
+        return "error"
+    return "queued" if text.startswith("⏳") else "ok"
+
+
+async def _run_agent(server, agent: Agent, interval: float, stop: threading.Event, recorder: Recorder):
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    async with create_connected_server_and_client_session(server.mcp) as session:
+        # Stagger start times so agents don't fire in lockstep.
+        next_at = time.monotonic() + agent.rng.random() * interval
+        while not stop.is_set():
+            if interval:
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(min(delay, 0.5))
+                    continue
+                next_at += interval
+            tool, args = agent.next_call()
+            start = time.perf_counter()
+            try:
+                outcome = _outcome(server, await session.call_tool(tool, args))
+            except Exception:
+                outcome = "error"
+            recorder.add(tool, time.perf_counter() - start, outcome)
+
+
+def _agent_thread(*args) -> None:
+    # Tools are synchronous, so each agent gets its own thread and event loop — otherwise
+    # one blocking tool call would serialize every session behind it.
+    asyncio.run(_run_agent(*args))
+
+
+async def calibrate(server, fake: FakeTodoist, seed: int) -> dict:
+    """Upstream requests per call for each tool in the mix, measured serially (cold, then warm)."""
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    agent = Agent(-1, fake, {c: 1 for c in MIX_CATEGORIES}, seed)
+    calls: dict = {}
+    for _ in range(400):
+        tool, args = agent.next_call()
+        calls.setdefault(tool, args)
+    amplification = {}
+    async with create_connected_server_and_client_session(server.mcp) as session:
+        for tool, args in sorted(calls.items()):
+            counts = []
+            for n in range(2):
+                if "task_name" in args:
+                    # Give name-based mutations a fresh, unambiguous target each time.
+                    args = dict(args, task_name=f"calibrate {tool} {n}")
+                    await session.call_tool("create_task", {"content": args["task_name"]})
+                elif tool == "create_task":
+                    args = dict(args, content=f"calibrate {tool} {n}")
+                before = sum(fake.requests.values())
+                await session.call_tool(tool, args)
+                counts.append(sum(fake.requests.values()) - before)
+            amplification[tool] = counts
+    return amplification
+
+
+# ═══════════════════════════════════════════════
+#  Runner
+# ═══════════════════════════════════════════════
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in MIX_CATEGORIES or not weight.strip().replace(".", "", 1).isdigit():
+            raise argparse.ArgumentTypeError(f"bad mix entry '{part}' (use e.g. read=30,search=20,list=30,mutate=20)")
+        if float(weight):
+            mix[name] = float(weight)
+    if not mix:
+        raise argparse.ArgumentTypeError("mix has no positive weights")
+    return mix
+
+
+def run(args) -> int:
+    fake = FakeTodoist(args.tasks, args.api_latency / 1000, args.seed)
+    httpd = serve(fake)
+    os.environ["TODOIST_API_BASE_URL"] = f"http://127.0.0.1:{httpd.server_port}/api/v1"
+    os.environ.setdefault("TODOIST_API_TOKEN", "load-test")
+    os.environ["TODOIST_MCP_STATE_DIR"] = tempfile.mkdtemp(prefix="todoist-mcp-load-")
+    from todoist_mcp import server
+
+    logging.getLogger("mcp").setLevel(logging.WARNING)  # one INFO line per request otherwise
+
+    print(f"Fake API on :{httpd.server_port} ({args.tasks} tasks, {args.api_latency:g}ms latency); "
+          f"{args.agents} agents, {'max' if not args.rate else f'{args.rate:g}'} calls/s, "
+          f"mix {', '.join(f'{k}={v:g}' for k, v in args.mix.items())}\n")
+
+    amplification = asyncio.run(calibrate(server, fake, args.seed))
+    print("Upstream requests per tool call (cold → warm):")
+    for tool, (cold, warm) in amplification.items():
+        print(f"  {tool:<22} {cold:>3} → {warm}")
+    print()
+
+    recorder = Recorder()
+    stop = threading.Event()
+    interval = args.agents / args.rate if args.rate else 0.0
+    threads = [
+        threading.Thread(target=_agent_thread, daemon=True,
+                         args=(server, Agent(i, fake, args.mix, args.seed), interval, stop, recorder))
+        for i in range(args.agents)
+    ]
+    for t in threads:
+        t.start()
+
+    # Warm-up traffic is excluded from all statistics and sets the memory baseline.
+    time.sleep(args.warmup)
+    recorder.reset()
+    if args.tracemalloc:
+        tracemalloc.start(10)
+        baseline_snapshot = tracemalloc.take_snapshot()
+    upstream_start = sum(fake.requests.values())
+    endpoints_start = Counter(fake.requests)
+    start = time.monotonic()
+    memory = [(0.0, rss_mb())]
+    last_upstream, last_report = upstream_start, start
+
+    print(f"{'elapsed':>9}  {'calls/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>6} {'queued':>6} {'upstream/call':>13} {'rss':>9}")
+    try:
+        while time.monotonic() - start < args.duration:
+            time.sleep(min(args.report_every, args.duration - (time.monotonic() - start)))
+            now = time.monotonic()
+            h = recorder.take_interval()
+            upstream = sum(fake.requests.values())
+            memory.append((now - start, rss_mb()))
+            elapsed = time.strftime("%H:%M:%S", time.gmtime(now - start))
+            print(f"{elapsed:>9}  {h.count / (now - last_report):>8.1f} {_ms(h.percentile(50)):>8} "
+                  f"{_ms(h.percentile(95)):>8} {_ms(h.percentile(99)):>8} {h.errors:>6} {h.queued:>6} "
+                  f"{(upstream - last_upstream) / max(h.count, 1):>13.2f} {memory[-1][1]:>7.1f}MB", flush=True)
+            last_upstream, last_report = upstream, now
+    except KeyboardInterrupt:
+        print("\nInterrupted — reporting what was measured so far.")
+    stop.set()
+    elapsed = time.monotonic() - start
+    for t in threads:
+        t.join(timeout=5)
+
+    total = recorder.total()
+    upstream = sum(fake.requests.values()) - upstream_start
+    print(f"\n── Summary ({elapsed:.0f}s after {args.warmup:g}s warm-up) ──")
+    print(f"  Tool calls:   {total.count} ({total.count / elapsed:.1f}/s), {total.errors} error(s), "
+          f"{total.queued} queued write(s)")
+    print(f"  Latency:      p50 {_ms(total.percentile(50))}  p95 {_ms(total.percentile(95))}  "
+          f"p99 {_ms(total.percentile(99))}  max {_ms(total.max)}")
+    print(f"  Upstream:     {upstream} HTTP requests, {upstream / max(total.count, 1):.2f} per tool call")
+    print(f"  Memory (RSS): {memory[0][1]:.1f}MB → {memory[-1][1]:.1f}MB, "
+          f"peak {max(m for _, m in memory):.1f}MB, trend {slope_per_hour(memory):+.1f}MB/hour"
+          + (" (run ≥10 min for a meaningful trend)" if elapsed < 600 else ""))
+
+    print(f"\n  {'tool':<22} {'calls':>7} {'errors':>6} {'queued':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for tool, h in sorted(recorder.tools.items(), key=lambda kv: -kv[1].count):
+        print(f"  {tool:<22} {h.count:>7} {h.errors:>6} {h.queued:>6} {_ms(h.percentile(50)):>8} {_ms(h.percentile(95)):>8} "
+              f"{_ms(h.percentile(99)):>8} {_ms(h.max):>8}")
+
+    print("\n  Busiest upstream endpoints:")
+    for endpoint, count in (Counter(fake.requests) - endpoints_start).most_common(8):
+        print(f"  {endpoint:<28} {count:>8}")
+
+    if args.tracemalloc:
+        print("\n  Largest allocation growth since warm-up:")
+        for stat in tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")[:10]:
+            print(f"  {stat}")
+    httpd.shutdown()
+    return 1 if args.max_error_rate is not None and total.errors > total.count * args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=8, help="concurrent MCP client sessions")
+    parser.add_argument("--rate", type=float, default=40, help="target tool calls/s across all agents (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=60, help="measured run length in seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring")
+    parser.add_argument("--report-every", type=float, default=10, help="seconds between progress lines")
+    parser.add_argument("--mix", type=parse_mix, default="read=30,search=20,list=30,mutate=20",
+                        help=f"relative weights of {', '.join(MIX_CATEGORIES)}")
+    parser.add_argument("--tasks", type=int, default=500, help="active tasks in the fake account")
+    parser.add_argument("--api-latency", type=float, default=20, help="simulated upstream latency in ms")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="report top allocation growth sites (slower)")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="exit with status 1 if the error ratio exceeds this (e.g. 0.01)")
+    sys.exit(run(parser.parse_args()))
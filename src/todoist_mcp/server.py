@@ -5,10 +5,34 @@ Connect AI agents to your Todoist tasks via the Todoist API v1.
 import os
 import sys
 import json
+import time
+import bisect
+import heapq
+import datetime
+import difflib
+import zoneinfo
 import uuid
 import re
+import random
+import gzip
+import codecs
+import hashlib
+import argparse
+import threading
+import contextlib
+import contextvars
+import functools
+import cProfile
+import collections
+import concurrent.futures
+import unicodedata
 import requests
 
+try:
+    import fcntl
+except ImportError:  # Windows: the outbox is then only serialized within one process
+    fcntl = None
+
 try:
     from mcp.server.fastmcp import FastMCP
 except ImportError:
@@ -25,8 +49,14 @@ mcp = FastMCP("todoist")
 # ╚═══════════════════════════════════════════════════════════════╝
 
 # ─── Other Configuration ───
-BASE_URL = "https://api.todoist.com/api/v1"
+BASE_URL = os.environ.get("TODOIST_API_BASE_URL", "https://api.todoist.com/api/v1")
 REQUEST_TIMEOUT = 30  # seconds — prevent hanging on network issues
+STATE_DIR = os.environ.get("TODOIST_MCP_STATE_DIR", os.path.join(os.path.expanduser("~"), ".todoist-mcp"))
+OUTBOX_DIR = os.path.join(STATE_DIR, "outbox")
+MUTATION_RETRIES = 3  # attempts per write before it is left in the outbox for replay
+RETRY_BACKOFF = 0.5  # seconds, doubled after each failed attempt
+NAME_INDEX_TTL = 300  # seconds before a name lookup re-fetches projects/sections/labels
+AGENDA_TTL = int(os.environ.get("TODOIST_MCP_AGENDA_TTL", "60"))  # seconds a cached agenda index stays fresh
 
 
 def _get_token() -> str:
@@ -44,13 +74,22 @@ def _get_token() -> str:
     return token
 
 
-def _headers() -> dict:
-    """Standard headers for Todoist API calls."""
-    return {
-        "Authorization": f"Bearer {_get_token()}",
-        "Content-Type": "application/json",
-        "X-Request-Id": str(uuid.uuid4()),
-    }
+def _token_fingerprint() -> str:
+    """Identifies the account the current token belongs to, without storing the token."""
+    return hashlib.sha256(_get_token().encode()).hexdigest()[:16]
+
+
+def _headers(request_id: str = "") -> dict:
+    """
+    Standard headers for Todoist API calls.
+    Pass a stable request_id to make a write idempotent across retries.
+    """
+    with _span("headers"):
+        return {
+            "Authorization": f"Bearer {_get_token()}",
+            "Content-Type": "application/json",
+            "X-Request-Id": request_id or str(uuid.uuid4()),
+        }
 
 
 def _extract_results(response_json) -> list:
@@ -58,11 +97,35 @@ def _extract_results(response_json) -> list:
     Extract results from API response.
     v1 API returns paginated: {"results": [...], "next_cursor": ...}
     """
-    if isinstance(response_json, list):
-        return response_json
-    if isinstance(response_json, dict):
-        return response_json.get("results", [])
-    return []
+    with _span("extract_results"):
+        if isinstance(response_json, list):
+            return response_json
+        if isinstance(response_json, dict):
+            return response_json.get("results", [])
+        return []
+
+
+def _iter_pages(path: str, params: dict | None = None):
+    """Yield the items of a paginated list endpoint page by page (follows next_cursor)."""
+    headers = _headers()
+    params = dict(params or {})
+    while True:
+        res = _get(path, params, headers)
+        res.raise_for_status()
+        data = _json(res)
+        if isinstance(data, list):
+            yield from data
+            return
+        yield from data.get("results", [])
+        cursor = data.get("next_cursor")
+        if not cursor:
+            return
+        params["cursor"] = cursor
+
+
+def _get_all(path: str, params: dict | None = None) -> list:
+    """Fetch every item of a paginated list endpoint."""
+    return list(_iter_pages(path, params))
 
 
 def _fmt_due(due: dict | None, deadline: dict | None = None) -> str:
@@ -103,20 +166,1086 @@ def _fmt_task(t: dict) -> str:
     return "\n".join(parts)
 
 
+# ═══════════════════════════════════════════════
+#  Tracing & Profiling (opt-in)
+# ═══════════════════════════════════════════════
+#
+# TODOIST_MCP_TRACE_FILE=<path> appends one line per finished span in the
+# OTLP/JSON file format (an ExportTraceServiceRequest per line, as written by
+# the OpenTelemetry Collector's file exporter and read by its otlpjsonfile
+# receiver). Each tool call is a root span — marked ERROR when the tool returns
+# an error — and token lookup, upstream requests, JSON decoding, result
+# extraction and formatting nest below it.
+#
+# TODOIST_MCP_PROFILE_EVERY=<N> runs every Nth tool call under cProfile and
+# keeps the PROFILE_KEEP slowest as .prof files in PROFILE_DIR
+# (inspect with `python -m pstats <file>`).
+
+TRACE_FILE = os.environ.get("TODOIST_MCP_TRACE_FILE", "")
+PROFILE_EVERY = int(os.environ.get("TODOIST_MCP_PROFILE_EVERY", "0"))
+PROFILE_DIR = os.environ.get("TODOIST_MCP_PROFILE_DIR", os.path.join(STATE_DIR, "profiles"))
+PROFILE_KEEP = 10
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("todoist_span", default=None)
+_trace_lock = threading.Lock()
+_trace_out = None  # trace file handle, opened on the first finished span
+_trace_error = ""  # set when TRACE_FILE cannot be written; tracing stays off afterwards
+_OTLP_KIND = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3}
+_OTLP_STATUS = {"UNSET": 0, "OK": 1, "ERROR": 2}
+_FAILURE_PREFIXES = ("Error", "❌")  # tool results that mark their span as ERROR
+_profile_lock = threading.Lock()  # held while a sampled call runs under cProfile
+_profile_calls_lock = threading.Lock()
+_profile_calls = 0
+_slowest_profiles: list = []  # min-heap of (seconds, path)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # int64 is a string in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _write_span(span: dict) -> None:
+    """
+    Append a finished span to TRACE_FILE as an OTLP/JSON ExportTraceServiceRequest line.
+    Tracing is diagnostics only: a write failure switches it off instead of failing the call.
+    """
+    global _trace_out, _trace_error
+    status = {"code": _OTLP_STATUS[span["status"]["code"]]}
+    if span["status"].get("message"):
+        status["message"] = span["status"]["message"]
+    otlp_span = {
+        "traceId": span["traceId"],
+        "spanId": span["spanId"],
+        "name": span["name"],
+        "kind": _OTLP_KIND[span["kind"]],
+        "startTimeUnixNano": str(span["startTimeUnixNano"]),
+        "endTimeUnixNano": str(span["endTimeUnixNano"]),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span["attributes"].items()],
+        "status": status,
+    }
+    if span["parentSpanId"]:
+        otlp_span["parentSpanId"] = span["parentSpanId"]
+    line = json.dumps({"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "todoist-mcp"}}]},
+        "scopeSpans": [{"scope": {"name": "todoist_mcp"}, "spans": [otlp_span]}],
+    }]})
+    with _trace_lock:
+        if _trace_error:
+            return
+        try:
+            if _trace_out is None:
+                _trace_out = open(TRACE_FILE, "a", encoding="utf-8", buffering=1)  # line-buffered
+            _trace_out.write(line + "\n")
+        except OSError as e:
+            _trace_error = str(e)
+            print(f"todoist-mcp: tracing disabled, cannot write {TRACE_FILE}: {e}", file=sys.stderr)
+
+
+@contextlib.contextmanager
+def _span(name: str, kind: str = "INTERNAL", **attributes):
+    """Record a tracing span around a block. A no-op unless TRACE_FILE is set."""
+    if not TRACE_FILE or _trace_error:
+        yield None
+        return
+    parent = _current_span.get()
+    span = {
+        "traceId": parent["traceId"] if parent else uuid.uuid4().hex,
+        "spanId": uuid.uuid4().hex[:16],
+        "parentSpanId": parent["spanId"] if parent else "",
+        "name": name,
+        "kind": kind,
+        "startTimeUnixNano": time.time_ns(),
+        "attributes": dict(attributes),
+        "status": {"code": "OK"},
+    }
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span["status"] = {"code": "ERROR", "message": str(e)}
+        raise
+    finally:
+        _current_span.reset(token)
+        span["endTimeUnixNano"] = time.time_ns()
+        _write_span(span)
+
+
+def _profiled(name: str, fn, args, kwargs):
+    """Run fn under cProfile; keep the stats only if it is among the slowest calls so far."""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        if len(_slowest_profiles) < PROFILE_KEEP or elapsed > _slowest_profiles[0][0]:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{elapsed * 1000:.0f}ms.prof")
+            profiler.dump_stats(path)
+            evicted = None
+            if len(_slowest_profiles) >= PROFILE_KEEP:
+                _, evicted = heapq.heappushpop(_slowest_profiles, (elapsed, path))
+            else:
+                heapq.heappush(_slowest_profiles, (elapsed, path))
+            if evicted:
+                with contextlib.suppress(OSError):
+                    os.remove(evicted)
+
+
+def _tool():
+    """Register an MCP tool, wrapped in a tracing span and the sampling profiler."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            global _profile_calls
+            try:
+                with _span(f"tool {fn.__name__}", kind="SERVER", **{"mcp.tool": fn.__name__}) as span:
+                    sample = False
+                    if PROFILE_EVERY > 0:
+                        with _profile_calls_lock:
+                            _profile_calls += 1
+                            sample = _profile_calls % PROFILE_EVERY == 0
+                    # cProfile cannot profile overlapping calls; skip if one is already running.
+                    if sample and _profile_lock.acquire(blocking=False):
+                        try:
+                            result = _profiled(fn.__name__, fn, args, kwargs)
+                        finally:
+                            _profile_lock.release()
+                    else:
+                        result = fn(*args, **kwargs)
+                    # Tools report failures as "Error ..." / "❌ ..." strings rather than raising.
+                    if span is not None and isinstance(result, str) and result.startswith(_FAILURE_PREFIXES):
+                        span["status"] = {"code": "ERROR", "message": result.split("\n", 1)[0]}
+                    return result
+            except _Pending as e:
+                return (f"⏳ Queued, will be delivered automatically (key {e.key}): {e}. "
+                        f"Do not repeat this call — the queued write is replayed with the same key.")
+        return mcp.tool()(wrapper)
+    return decorator
+
+
+# ═══════════════════════════════════════════════
+#  JSON Decoding
+# ═══════════════════════════════════════════════
+#
+# Whole responses are decoded with orjson when it is installed
+# (pip install 'todoist-mcp-helper[fast]') and the stdlib otherwise; set
+# TODOIST_MCP_JSON=stdlib to force the fallback. List pages are capped at 200
+# items, so they are decoded whole. Sync payloads have no such cap (a full sync
+# returns the entire account), so they are parsed incrementally instead: items
+# are yielded while the body is still downloading, and only what the caller
+# keeps is ever held in memory.
+
+JSON_BACKEND = os.environ.get("TODOIST_MCP_JSON", "auto")
+STREAM_CHUNK = 64 * 1024  # bytes read per network chunk when streaming
+
+_json_loads = json.loads
+if JSON_BACKEND in ("auto", "orjson"):
+    try:
+        import orjson
+        _json_loads = orjson.loads
+    except ImportError:
+        if JSON_BACKEND == "orjson":
+            raise
+_JSON_BACKEND_NAME = "orjson" if _json_loads is not json.loads else "stdlib"
+
+
+def _json(res: requests.Response):
+    """Decode a response body as JSON with the fastest available backend."""
+    body = res.content
+    with _span("json.decode", **{"http.response.body.size": len(body), "json.backend": _JSON_BACKEND_NAME}):
+        return _json_loads(body) if body else None
+
+
+_JSON_WS = " \t\n\r"
+
+
+def _iter_json_arrays(chunks, keys, meta: dict):
+    """
+    Incrementally parse a JSON document from an iterable of byte chunks.
+
+    Yields (key, element) for each element of the top-level arrays named in
+    `keys`, as soon as the element has arrived; any other top-level values are
+    stored in `meta` (complete once the generator is exhausted). A bare
+    top-level array yields (None, element).
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf, pos, eof = "", 0, False
+
+    def more() -> None:
+        nonlocal buf, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            text = utf8.decode(b"", final=True)
+        else:
+            text = utf8.decode(chunk)
+        buf, pos = buf[pos:] + text, 0
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _JSON_WS:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                raise ValueError("unexpected end of JSON")
+            more()
+
+    def value():
+        nonlocal pos
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            if not eof and (end == len(buf) or (isinstance(obj, (int, float)) and buf[end] not in _JSON_WS + ",]}")):
+                more()  # a number may continue in the next chunk ('12' of '12.5'); re-parse with more data
+                continue
+            pos = end
+            return obj
+
+    def elements(key):
+        nonlocal pos
+        pos += 1  # '['
+        while True:
+            c = peek()
+            if c == "]":
+                pos += 1
+                return
+            if c == ",":
+                pos += 1
+                continue
+            yield key, value()
+
+    if peek() == "[":
+        yield from elements(None)
+        return
+    if peek() != "{":
+        raise ValueError("expected a JSON object or array")
+    pos += 1
+    while True:
+        c = peek()
+        if c == "}":
+            return
+        if c == ",":
+            pos += 1
+            continue
+        name = value()
+        if peek() != ":":
+            raise ValueError("expected ':' in JSON object")
+        pos += 1
+        if peek() == "[" and name in keys:
+            yield from elements(name)
+        else:
+            meta[name] = value()
+
+
+# ═══════════════════════════════════════════════
+#  Latency: Adaptive Timeouts & Hedged Reads
+# ═══════════════════════════════════════════════
+#
+# Each endpoint (method + path) keeps a window of observed latencies. Once there are enough
+# samples the timeout becomes TIMEOUT_MULTIPLIER × p99 (clamped between
+# MIN_TIMEOUT and REQUEST_TIMEOUT) instead of a flat 30 s. With
+# TODOIST_MCP_HEDGE=1, a GET that has not answered by the endpoint's p95 is
+# sent a second time and the first response wins; hedges are limited to
+# HEDGE_BUDGET of all GETs so a slow upstream is not hit twice as hard.
+# Primaries never wait for a pool slot: a GET runs on the calling thread unless
+# a hedge could actually be sent, and then on a thread of its own so the caller
+# can take whichever reply arrives first. Only backups use the bounded pool,
+# and a hedge is skipped rather than queued when all HEDGE_WORKERS are busy.
+# A GET that hits its adaptive timeout is retried once with REQUEST_TIMEOUT, so
+# a response slower than the learned p99 costs time rather than a failed call.
+# Writes are retried with REQUEST_TIMEOUT after a timeout too. A full sync reads
+# the whole account and Sync command batches vary with their size, so both
+# always get REQUEST_TIMEOUT; batches are tracked as 'POST /sync commands',
+# apart from the small incremental reads.
+
+LATENCY_WINDOW = 500  # samples kept per endpoint
+LATENCY_MIN_SAMPLES = 20  # below this, fall back to REQUEST_TIMEOUT
+TIMEOUT_MULTIPLIER = 3.0
+MIN_TIMEOUT = 2.0  # seconds
+HEDGE_ENABLED = os.environ.get("TODOIST_MCP_HEDGE", "") == "1"
+HEDGE_BUDGET = 0.1  # at most ~10% extra GETs
+HEDGE_WORKERS = 8  # concurrent backup requests
+
+_latency_lock = threading.Lock()
+_latency: dict = {}  # endpoint -> {"upstream": deque, "total": deque, "hedged": int, "hedge_wins": int}
+_hedge_tokens = 1.0
+_hedges_in_flight = 0
+_hedge_pool: concurrent.futures.ThreadPoolExecutor | None = None
+
+
+def _endpoint(method: str, path: str) -> str:
+    """Collapse IDs so latencies are grouped per endpoint ('POST', '/tasks/123/close' → 'POST /tasks/{id}/close')."""
+    return f"{method} " + re.sub(r"^(/[a-z_]+)/[^/]+", r"\1/{id}", path)
+
+
+def _stats(endpoint: str) -> dict:
+    st = _latency.get(endpoint)
+    if st is None:
+        st = _latency[endpoint] = {
+            "upstream": collections.deque(maxlen=LATENCY_WINDOW),
+            "total": collections.deque(maxlen=LATENCY_WINDOW),
+            "hedged": 0,
+            "hedge_wins": 0,
+        }
+    return st
+
+
+def _record_latency(endpoint: str, kind: str, seconds: float) -> None:
+    with _latency_lock:
+        _stats(endpoint)[kind].append(seconds)
+
+
+def _percentile(samples, pct: float) -> float | None:
+    """Nearest-rank percentile of a sample window, or None if it is too small."""
+    if len(samples) < LATENCY_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def _timeout_for(endpoint: str) -> float:
+    """Adaptive timeout for an endpoint, derived from its observed p99."""
+    with _latency_lock:
+        p99 = _percentile(list(_stats(endpoint)["upstream"]), 99)
+    if p99 is None:
+        return REQUEST_TIMEOUT
+    return min(REQUEST_TIMEOUT, max(MIN_TIMEOUT, p99 * TIMEOUT_MULTIPLIER))
+
+
+def _timed_get(url: str, endpoint: str, headers: dict, params: dict | None, timeout: float) -> requests.Response:
+    start = time.perf_counter()
+    with _span(endpoint, kind="CLIENT", **{"http.request.method": "GET", "http.timeout": timeout}) as span:
+        try:
+            res = requests.get(url, headers=headers, params=params, timeout=timeout)
+            if span is not None:
+                span["attributes"]["http.response.status_code"] = res.status_code
+            return res
+        finally:
+            _record_latency(endpoint, "upstream", time.perf_counter() - start)
+
+
+def _can_hedge() -> bool:
+    return _hedge_tokens >= 1 and _hedges_in_flight < HEDGE_WORKERS
+
+
+def _take_hedge_slot() -> bool:
+    """Reserve a hedge token and a backup worker, if both are available."""
+    global _hedge_tokens, _hedges_in_flight
+    with _latency_lock:
+        if not _can_hedge():
+            return False
+        _hedge_tokens -= 1
+        _hedges_in_flight += 1
+        return True
+
+
+def _backup_get(*args) -> requests.Response:
+    global _hedges_in_flight
+    try:
+        return _timed_get(*args)
+    finally:
+        with _latency_lock:
+            _hedges_in_flight -= 1
+
+
+def _in_thread(fn, *args) -> concurrent.futures.Future:
+    """Run fn on a new thread (with the caller's context) and return a future for its result."""
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    ctx = contextvars.copy_context()
+
+    def run() -> None:
+        try:
+            future.set_result(ctx.run(fn, *args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="todoist-get", daemon=True).start()
+    return future
+
+
+def _hedged_get(url: str, endpoint: str, headers: dict, params: dict | None, timeout: float) -> requests.Response:
+    """Send a GET, and a backup copy if the first one is slower than the endpoint's p95."""
+    global _hedge_pool
+    with _latency_lock:
+        p95 = _percentile(list(_stats(endpoint)["upstream"]), 95)
+        hedgeable = p95 is not None and _can_hedge()
+        if hedgeable and _hedge_pool is None:
+            _hedge_pool = concurrent.futures.ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="todoist-hedge")
+    if not hedgeable:
+        return _timed_get(url, endpoint, headers, params, timeout)
+    primary = _in_thread(_timed_get, url, endpoint, headers, params, timeout)
+    done, _ = concurrent.futures.wait([primary], timeout=p95)
+    if done or not _take_hedge_slot():
+        return primary.result()
+    backup = _hedge_pool.submit(contextvars.copy_context().run, _backup_get, url, endpoint, headers, params, timeout)
+    with _latency_lock:
+        _stats(endpoint)["hedged"] += 1
+    pending = {primary, backup}
+    while True:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        ok = [f for f in done if f.exception() is None]
+        if ok or not pending:
+            # First success wins; fail only once both copies have failed.
+            winner = ok[0] if ok else done.pop()
+            for f in {primary, backup} - {winner}:
+                f.add_done_callback(lambda f: f.exception() is None and f.result().close())
+            if winner is backup:
+                with _latency_lock:
+                    _stats(endpoint)["hedge_wins"] += 1
+            return winner.result()
+
+
+def _get(path: str, params: dict | None = None, headers: dict | None = None) -> requests.Response:
+    """GET an API path with an adaptive timeout (and hedging, if enabled). Does not raise for status."""
+    global _hedge_tokens
+    endpoint = _endpoint("GET", path)
+    url = f"{BASE_URL}{path}"
+    headers = headers or _headers()
+    timeout = _timeout_for(endpoint)
+    start = time.perf_counter()
+    try:
+        if HEDGE_ENABLED:
+            with _latency_lock:
+                _hedge_tokens = min(10.0, _hedge_tokens + HEDGE_BUDGET)
+            res = _hedged_get(url, endpoint, headers, params, timeout)
+        else:
+            res = _timed_get(url, endpoint, headers, params, timeout)
+    except requests.Timeout:
+        if timeout >= REQUEST_TIMEOUT:
+            raise
+        # The learned timeout was too tight for this response; a GET is safe to repeat.
+        res = _timed_get(url, endpoint, headers, params, REQUEST_TIMEOUT)
+    _record_latency(endpoint, "total", time.perf_counter() - start)
+    return res
+
+
+def _fmt_ms(seconds: float | None) -> str:
+    return "—" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+@_tool()
+def get_latency_report() -> str:
+    """
+    Show observed Todoist API latency per endpoint: p50/p95/p99, the adaptive
+    timeout currently in use, and how often hedged (duplicate) reads were sent and won.
+    """
+    with _latency_lock:
+        snapshot = {ep: {k: (list(v) if isinstance(v, collections.deque) else v) for k, v in st.items()}
+                    for ep, st in _latency.items()}
+    if not snapshot:
+        return "No API calls recorded yet."
+    lines = [f"⏱️ API latency (hedging {'on' if HEDGE_ENABLED else 'off'}, last {LATENCY_WINDOW} calls per endpoint)"]
+    for ep in sorted(snapshot):
+        st = snapshot[ep]
+        up, total = st["upstream"], st["total"]
+        line = (
+            f"- {ep}: {len(up)} upstream call(s), p50 {_fmt_ms(_percentile(up, 50))}, "
+            f"p95 {_fmt_ms(_percentile(up, 95))}, p99 {_fmt_ms(_percentile(up, 99))}; "
+            f"timeout {_timeout_for(ep):.1f}s"
+        )
+        if total:
+            line += f"; end-to-end p99 {_fmt_ms(_percentile(total, 99))}"
+        if st["hedged"]:
+            line += f"; hedged {st['hedged']}×, backup won {st['hedge_wins']}×"
+        lines.append(line)
+    if any(len(st["upstream"]) < LATENCY_MIN_SAMPLES for st in snapshot.values()):
+        lines.append(f"(percentiles need at least {LATENCY_MIN_SAMPLES} samples)")
+    return "\n".join(lines)
+
+
+# ═══════════════════════════════════════════════
+#  Durable Outbox (idempotent writes)
+# ═══════════════════════════════════════════════
+#
+# Every mutating call is written to OUTBOX_DIR before it is sent and carries a
+# stable X-Request-Id (the idempotency key), so Todoist deduplicates retries of
+# the same logical operation. Writes that still fail on network errors stay on
+# disk and are replayed with the same key — in the background after the next
+# successful write, or via the flush_outbox tool, including after a server restart. Each queued
+# write records the fingerprint of the token it was made with and is only
+# replayed while that token is active, so switching accounts never delivers a
+# write into the wrong one. Replayed writes that Todoist refuses (4xx) are moved
+# to OUTBOX_DIR/rejected until flush_outbox reports them. A write may name a
+# receipt file; when it is delivered by a replay, the response body is saved
+# there for the caller that queued it (e.g. an import waiting for new IDs).
+# Several server processes may share OUTBOX_DIR (one per MCP host window). A
+# write is claimed before it is sent by renaming its file to
+# `<seq>-<key>.<pid>.sending`; a claim is only taken over once its process is
+# gone (or OUTBOX_LEASE has passed), so a write is never sent by two senders at
+# once. The in-process lock plus an flock on OUTBOX_DIR/.lock is held only while
+# writing, listing and claiming files, never during a send, so writes run
+# concurrently. Order is kept per resource: a write waits only for older
+# writes that change, or point at, the same task / project / section / comment
+# / label.
+
+OUTBOX_LEASE = 2 * MUTATION_RETRIES * REQUEST_TIMEOUT  # seconds before another sender's claim is presumed dead
+
+_outbox_lock = threading.RLock()
+_outbox_lock_depth = 0  # re-entrant holds of _outbox_lock; only the outermost takes the flock
+_outbox_lock_file = None
+_sending: set = set()  # keys of the writes this process is sending right now
+_replaying = threading.Lock()  # held by the background replay thread
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_SYNC_COLLECTIONS = {"item": "/tasks", "project": "/projects", "section": "/sections", "note": "/comments", "label": "/labels"}
+_REF_FIELDS = {"parent_id": "/tasks", "task_id": "/tasks", "item_id": "/tasks", "project_id": "/projects", "section_id": "/sections"}
+
+
+@contextlib.contextmanager
+def _outbox_locked():
+    """Hold the outbox against other threads and other server processes sharing STATE_DIR."""
+    global _outbox_lock_depth, _outbox_lock_file
+    with _outbox_lock:
+        if _outbox_lock_depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(OUTBOX_DIR, exist_ok=True)
+                f = open(os.path.join(OUTBOX_DIR, ".lock"), "a")
+            except OSError:
+                f = None  # state dir not writable — nothing is queued on disk to race over
+            if f is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                _outbox_lock_file = f
+        _outbox_lock_depth += 1
+        try:
+            yield
+        finally:
+            _outbox_lock_depth -= 1
+            if _outbox_lock_depth == 0 and _outbox_lock_file is not None:
+                _outbox_lock_file.close()  # releases the flock
+                _outbox_lock_file = None
+
+
+class _Pending(BaseException):
+    """
+    A write could not be delivered yet and remains queued in the outbox.
+    Derives from BaseException so the tools' `except Exception` handlers let it
+    through to _tool(), which reports the write as queued instead of failed —
+    an agent that sees an error would retry with a new key and create a duplicate.
+    """
+
+    def __init__(self, message: str, key: str):
+        super().__init__(message)
+        self.key = key
+
+
+def _outbox_path(op: dict, pid: int | None = None) -> str:
+    """Path of a queued write, or of the same write while process `pid` is sending it."""
+    name = f"{op['seq']:020d}-{op['key']}"
+    return os.path.join(OUTBOX_DIR, f"{name}.json" if pid is None else f"{name}.{pid}.sending")
+
+
+def _outbox_put(op: dict) -> None:
+    """Persist a new operation, already claimed by this process (write to a temp file, then rename)."""
+    os.makedirs(OUTBOX_DIR, exist_ok=True)
+    path = _outbox_path(op, os.getpid())
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(op, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _outbox_claim(op: dict, path: str) -> bool:
+    """Take over a queued (or abandoned) write for sending. Call with the outbox locked."""
+    _sending.add(op["key"])
+    claimed = _outbox_path(op, os.getpid())
+    try:
+        os.rename(path, claimed)
+        os.utime(claimed)  # the lease runs from the claim, not from when the write was queued
+    except OSError:
+        _sending.discard(op["key"])
+        return False
+    return True
+
+
+def _outbox_release(op: dict) -> None:
+    """Put a claimed write back in the queue after it could not be delivered."""
+    with _outbox_locked(), contextlib.suppress(OSError):
+        os.rename(_outbox_path(op, os.getpid()), _outbox_path(op))
+
+
+def _outbox_remove(op: dict) -> None:
+    try:
+        os.remove(_outbox_path(op, os.getpid()))
+    except FileNotFoundError:
+        pass
+
+
+def _outbox_reject(op: dict, res: requests.Response) -> None:
+    """Set aside a replayed write that Todoist refused, for flush_outbox to report."""
+    try:
+        os.makedirs(os.path.join(OUTBOX_DIR, "rejected"), exist_ok=True)
+        path = os.path.join(OUTBOX_DIR, "rejected", os.path.basename(_outbox_path(op)))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**op, "status": f"{res.status_code} {res.reason}"}, f)
+    except OSError:
+        pass
+    _outbox_remove(op)
+
+
+def _outbox_take_rejected() -> list:
+    """Return and forget the current account's rejected writes, oldest first."""
+    folder = os.path.join(OUTBOX_DIR, "rejected")
+    if not os.path.isdir(folder):
+        return []
+    account, ops = _token_fingerprint(), []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                op = json.load(f)
+            if op.get("account") == account:
+                ops.append(op)
+                os.remove(path)
+        except (OSError, ValueError):
+            continue
+    return ops
+
+
+def _write_receipt(path: str, res: requests.Response) -> None:
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(res.text)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def _outbox_entries() -> list:
+    """Every write on disk, oldest first, as (op, path, pid of its sender or None if queued)."""
+    if not os.path.isdir(OUTBOX_DIR):
+        return []
+    entries = []
+    for name in sorted(os.listdir(OUTBOX_DIR)):
+        if name.endswith(".json"):
+            pid = None
+        elif name.endswith(".sending"):
+            pid = int(name.removesuffix(".sending").rsplit(".", 1)[1])
+        else:
+            continue
+        path = os.path.join(OUTBOX_DIR, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries.append((json.load(f), path, pid))
+        except (OSError, ValueError):
+            continue  # delivered (or renamed) since the listing
+    return entries
+
+
+def _outbox_pending() -> list:
+    """Load undelivered operations (queued or being sent), oldest first."""
+    return [op for op, _, _ in _outbox_entries()]
+
+
+def _abandoned(pid: int, path: str) -> bool:
+    """Whether a claimed write's sender has gone away, so the write may be taken over."""
+    if pid == os.getpid():
+        return os.path.basename(path).split(".", 1)[0].split("-", 1)[1] not in _sending
+    try:
+        if time.time() - os.path.getmtime(path) > OUTBOX_LEASE:
+            return True
+    except OSError:
+        return False  # delivered meanwhile
+    if os.name != "posix":
+        return False  # no cheap liveness check; rely on the lease
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # e.g. EPERM: the process exists
+    return False
+
+
+def _op_resources(op: dict) -> tuple[set, set]:
+    """(targets, refs): the resources a write changes, and the ones it points at."""
+    targets, refs = set(), set()
+    m = re.match(r"^(/[a-z_]+)/([^/]+)", op["path"])
+    if m:
+        targets.add(f"{m[1]}/{m[2]}")
+    body = op.get("body") or {}
+    for args in [body] + [cmd.get("args") or {} for cmd in body.get("commands", [])]:
+        refs.update(f"{c}/{args[f]}" for f, c in _REF_FIELDS.items() if isinstance(args.get(f), (str, int)) and args[f])
+    for cmd in body.get("commands", []):
+        collection = _SYNC_COLLECTIONS.get(cmd.get("type", "").split("_", 1)[0])
+        if collection and (cmd.get("args") or {}).get("id"):
+            targets.add(f"{collection}/{cmd['args']['id']}")
+    return targets, refs
+
+
+def _conflicts(a: tuple[set, set], b: tuple[set, set]) -> bool:
+    """Whether two writes must be applied in order: one changes what the other changes or points at."""
+    return bool(a[0] & (b[0] | b[1]) or b[0] & a[1])
+
+
+def _send_op(op: dict) -> requests.Response:
+    """
+    Send a queued operation, retrying request failures with the same idempotency key.
+    Raises _Pending whenever delivery is unconfirmed, so the op stays queued.
+    """
+    delay = RETRY_BACKOFF
+    error: Exception | None = None
+    endpoint = _endpoint(op["method"], op["path"])
+    # Command batches range from one command to SYNC_BATCH_SIZE, so no learned
+    # timeout fits them; they get their own window (for the report) and the full timeout.
+    batch = op["path"] == "/sync"
+    if batch:
+        endpoint += " commands"
+    for attempt in range(MUTATION_RETRIES):
+        if attempt:
+            time.sleep(delay)
+            delay *= 2
+        # After a timeout, the learned timeout was too tight for this write — give the retry the full one.
+        timeout = REQUEST_TIMEOUT if batch or isinstance(error, requests.Timeout) else _timeout_for(endpoint)
+        start = time.perf_counter()
+        try:
+            with _span(endpoint, kind="CLIENT", **{
+                "http.request.method": op["method"], "todoist.idempotency_key": op["key"], "retry.attempt": attempt,
+            }) as span:
+                res = requests.request(
+                    op["method"],
+                    f"{BASE_URL}{op['path']}",
+                    headers=_headers(op["key"]),
+                    json=op.get("body"),
+                    timeout=timeout,
+                )
+                if span is not None:
+                    span["attributes"]["http.response.status_code"] = res.status_code
+        except requests.RequestException as e:
+            error = e
+            continue
+        except Exception as e:
+            # Not retryable, but the request may still have been applied — keep the
+            # op queued rather than let the caller retry it under a new key.
+            raise _Pending(f"{op['method']} {op['path']} not confirmed yet ({e})", op["key"]) from e
+        finally:
+            _record_latency(endpoint, "upstream", time.perf_counter() - start)
+        if res.status_code in _RETRYABLE_STATUS:
+            error = requests.HTTPError(f"{res.status_code} {res.reason}", response=res)
+            continue
+        return res
+    raise _Pending(f"{op['method']} {op['path']} not confirmed yet ({error})", op["key"])
+
+
+def _deliver_claimed(op: dict) -> bool:
+    """
+    Send a queued write this process has claimed. Returns True if it was delivered,
+    False if Todoist refused it (it is set aside); raises _Pending if it stays queued.
+    """
+    try:
+        try:
+            res = _send_op(op)
+        except _Pending:
+            _outbox_release(op)
+            raise
+        # Delivered or permanently rejected (4xx) — either way it must not be resent.
+        if not res.ok:
+            _outbox_reject(op, res)
+            return False
+        if op.get("receipt"):
+            _write_receipt(op["receipt"], res)
+        _outbox_remove(op)
+        _after_write(op["method"], op["path"], None)
+        return True
+    finally:
+        _sending.discard(op["key"])
+
+
+def _replay_outbox() -> tuple[int, int]:
+    """
+    Replay the current account's queued operations, oldest first. Returns
+    (delivered, still_pending); refused writes are set aside, not counted.
+    Writes another sender is working on, and writes behind an undelivered
+    older one on the same resource, are left alone.
+    """
+    delivered, tried = 0, set()
+    account = _token_fingerprint()
+    while True:
+        op = None
+        with _outbox_locked():
+            entries = [(o, path, pid, _op_resources(o)) for o, path, pid in _outbox_entries() if o.get("account") == account]
+            for i, (o, path, pid, resources) in enumerate(entries):
+                if o["key"] in tried or (pid is not None and not _abandoned(pid, path)):
+                    continue
+                if any(_conflicts(resources, older[3]) for older in entries[:i]):
+                    continue
+                if _outbox_claim(o, path):
+                    op = o
+                    break
+        if op is None:
+            break
+        tried.add(op["key"])
+        try:
+            delivered += _deliver_claimed(op)
+        except _Pending:
+            break  # most likely offline — leave the rest for the next replay
+    return delivered, sum(1 for o in _outbox_pending() if o.get("account") == account)
+
+
+def _replay_in_background() -> None:
+    """Start delivering the current account's queued writes without holding up the caller."""
+    if not _replaying.acquire(blocking=False):
+        return  # a replay is already running
+
+    def run() -> None:
+        try:
+            _replay_outbox()
+        except Exception:
+            pass  # best effort — the next write or flush_outbox retries again
+        finally:
+            _replaying.release()
+
+    threading.Thread(target=run, name="todoist-outbox-replay", daemon=True).start()
+
+
+def _deliver_older(op: dict) -> None:
+    """
+    Deliver, or wait for whoever is sending them, the older writes that `op`
+    must follow. Raises _Pending if one of them stays undelivered.
+    """
+    resources = _op_resources(op)
+    deadline = time.monotonic() + OUTBOX_LEASE
+    while True:
+        with _outbox_locked():
+            older = next(((o, path, pid) for o, path, pid in _outbox_entries()
+                          if (o["seq"], o["key"]) < (op["seq"], op["key"]) and o.get("account") == op["account"]
+                          and _conflicts(resources, _op_resources(o))), None)
+            if older is None:
+                return
+            o, path, pid = older
+            claimed = (pid is None or _abandoned(pid, path)) and _outbox_claim(o, path)
+        if not claimed:
+            if time.monotonic() > deadline:
+                raise _Pending(f"{op['method']} {op['path']} is waiting behind an earlier write to the same item", op["key"])
+            time.sleep(0.05)  # another thread or process is sending it
+            continue
+        try:
+            _deliver_claimed(o)
+        except _Pending:
+            raise _Pending(f"{op['method']} {op['path']} is waiting behind an undelivered write to the same item",
+                           op["key"]) from None
+
+
+def _mutate(method: str, path: str, body: dict | None = None, receipt: str = "") -> requests.Response:
+    """
+    Perform a mutating API call through the durable outbox.
+    Raises for HTTP errors like requests would; raises _Pending if the write
+    could not be delivered yet (it will be replayed later, and its response
+    saved to `receipt` if given).
+    """
+    op = {
+        "key": str(uuid.uuid4()),
+        "seq": time.time_ns(),
+        "account": _token_fingerprint(),  # also fails fast on a missing token
+        "method": method,
+        "path": path,
+        "body": body,
+    }
+    if receipt:
+        op["receipt"] = receipt
+    _sending.add(op["key"])
+    try:
+        try:
+            with _outbox_locked():
+                _outbox_put(op)
+            durable = True
+        except OSError:
+            durable = False  # state dir not writable — still send, just without durability
+        try:
+            if durable:
+                _deliver_older(op)
+            res = _send_op(op)
+        except _Pending as e:
+            _after_write(method, path, None)  # it will land later, outside any cached view
+            if durable:
+                _outbox_release(op)
+                raise
+            raise requests.ConnectionError(f"{e} and could not be queued: the outbox directory is not writable") from None
+        if durable:
+            _outbox_remove(op)
+    finally:
+        _sending.discard(op["key"])
+    _after_write(method, path, res)
+    if durable and any(pid is None and o.get("account") == op["account"] for o, _, pid in _outbox_entries()):
+        _replay_in_background()
+    res.raise_for_status()
+    return res
+
+
+def _sync_commands(commands: list, receipt: str = "") -> dict:
+    """Apply Sync API commands in one request (through the outbox — command UUIDs make it idempotent)."""
+    res = _mutate("POST", "/sync", {"commands": commands}, receipt)
+    return _json(res)
+
+
+# ═══════════════════════════════════════════════
+#  Name → ID Resolution
+# ═══════════════════════════════════════════════
+#
+# Write tools accept project / section / label names as well as IDs. Names are
+# resolved against a local index that list and create/delete tools keep up to
+# date; the API is queried when the index is cold, stale, or has no exact match.
+# Only exact (case-, whitespace- and symbol-insensitive) names are applied.
+
+def _normalize_name(name: str) -> str:
+    """Case-, whitespace- and symbol-insensitive form of a name ('#Work ' / '💼 Work' → 'work')."""
+    kept = "".join(ch for ch in name if not unicodedata.category(ch).startswith("S"))
+    return " ".join(kept.strip().lstrip("#@").split()).casefold()
+
+
+class _NameIndex:
+    """Local name→item index for one resource type (projects, sections or labels)."""
+
+    def __init__(self, kind: str, path: str):
+        self.kind = kind
+        self.path = path
+        self.items: dict = {}
+        self.loaded_at: float | None = None
+        self.lock = threading.Lock()
+
+    def load(self, items: list) -> None:
+        with self.lock:
+            self.items = {str(it["id"]): it for it in items}
+            self.loaded_at = time.monotonic()
+
+    def add(self, item: dict) -> None:
+        with self.lock:
+            self.items[str(item["id"])] = item
+
+    def refresh(self, data, items: list) -> None:
+        """Keep the index current from a list response: replace it if the listing was complete."""
+        if isinstance(data, dict) and data.get("next_cursor"):
+            for it in items:
+                self.add(it)
+        else:
+            self.load(items)
+
+    def remove(self, item_id: str) -> None:
+        with self.lock:
+            self.items.pop(str(item_id), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.items = {}
+            self.loaded_at = None
+
+    def name_of(self, item_id: str) -> str:
+        with self.lock:
+            return self.items.get(str(item_id), {}).get("name", item_id)
+
+    def _match(self, name: str, project_id: str = "") -> list:
+        """Items whose ID or normalized name equals `name` exactly."""
+        with self.lock:
+            items = [it for it in self.items.values() if not project_id or str(it.get("project_id")) == project_id]
+        if name in {str(it["id"]) for it in items}:
+            return [it for it in items if str(it["id"]) == name]
+        key = _normalize_name(name)
+        return [it for it in items if _normalize_name(it.get("name", "")) == key]
+
+    def _suggest(self, name: str, project_id: str = "") -> list:
+        """Names starting with, or close to, `name` — offered as suggestions, never applied."""
+        with self.lock:
+            names = {_normalize_name(it.get("name", "")): it.get("name", "") for it in self.items.values()
+                     if not project_id or str(it.get("project_id")) == project_id}
+        key = _normalize_name(name)
+        prefixed = sorted(n for n in names if key and n.startswith(key))
+        close = [n for n in difflib.get_close_matches(key, names, n=3, cutoff=0.75) if n not in prefixed]
+        return [names[n] for n in (prefixed + close)[:3]]
+
+    def resolve(self, name: str, project_id: str = "") -> dict:
+        """
+        Return the single item whose ID or normalized name is exactly `name`. A
+        miss in the cached index is retried against a fresh listing, so an item
+        created elsewhere is still found. Prefix and near matches are only
+        suggested: a write must never land in a different item than the one named.
+        """
+        fresh = self.loaded_at is not None and time.monotonic() - self.loaded_at < NAME_INDEX_TTL
+        matches = self._match(name, project_id) if fresh else []
+        if not matches:
+            self.load(_get_all(self.path))
+            matches = self._match(name, project_id)
+        if not matches:
+            suggestions = self._suggest(name, project_id)
+            hint = f"; did you mean {' or '.join(repr(n) for n in suggestions)}?" if suggestions else ""
+            raise ValueError(f"no {self.kind} '{name}'{hint}")
+        if len(matches) > 1:
+            found = ", ".join(f"'{it.get('name')}' ({it['id']})" for it in matches[:10])
+            more = f" and {len(matches) - 10} more" if len(matches) > 10 else ""
+            raise ValueError(f"'{name}' matches several {self.kind}s: {found}{more}; pass the ID instead")
+        return matches[0]
+
+
+_projects_index = _NameIndex("project", "/projects")
+_sections_index = _NameIndex("section", "/sections")
+_labels_index = _NameIndex("label", "/labels")
+
+
+def _reset_account_caches() -> None:
+    """Forget everything cached for the previous account after a token switch."""
+    global _account_tz
+    for index in (_projects_index, _sections_index, _labels_index):
+        index.clear()
+    _account_tz = None
+    _invalidate_task_caches()
+
+
+def _resolve_project(project_id: str, project: str) -> str:
+    """Return project_id, or the ID of the project named `project`."""
+    if project_id or not project:
+        return project_id
+    return str(_projects_index.resolve(project)["id"])
+
+
+def _resolve_section(section_id: str, section: str, project_id: str = "") -> str:
+    """Return section_id, or the ID of the section named `section` (scoped to project_id if given)."""
+    if section_id or not section:
+        return section_id
+    return str(_sections_index.resolve(section, project_id)["id"])
+
+
+def _canonical_label(label: str) -> str:
+    """
+    Map a label name onto the existing label's exact spelling ('URGENT' → 'urgent').
+    Only exact normalized matches are used — unknown labels pass through, since
+    Todoist creates them on the fly.
+    """
+    try:
+        return _labels_index.resolve(label)["name"]
+    except ValueError:
+        return label.strip()
+
+
 # ═══════════════════════════════════════════════
 #  Projects
 # ═══════════════════════════════════════════════
 
-@mcp.tool()
+@_tool()
 def list_projects() -> str:
     """
     List all projects in the user's Todoist account.
     Returns project names, IDs, and colors.
     """
     try:
-        res = requests.get(f"{BASE_URL}/projects", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _get("/projects")
         res.raise_for_status()
-        projects = _extract_results(res.json())
+        data = _json(res)
+        projects = _extract_results(data)
+        _projects_index.refresh(data, projects)
         if not projects:
             return "No projects found."
         lines = []
@@ -129,7 +1258,7 @@ def list_projects() -> str:
         return f"Error listing projects: {e}"
 
 
-@mcp.tool()
+@_tool()
 def create_project(name: str, color: str = "", parent_id: str = "") -> str:
     """
     Create a new project.
@@ -145,15 +1274,16 @@ def create_project(name: str, color: str = "", parent_id: str = "") -> str:
     if parent_id:
         body["parent_id"] = parent_id
     try:
-        res = requests.post(f"{BASE_URL}/projects", headers=_headers(), json=body, timeout=REQUEST_TIMEOUT)
+        res = _mutate("POST", "/projects", body)
         res.raise_for_status()
-        p = res.json()
+        p = _json(res)
+        _projects_index.add(p)
         return f"✅ Project created: '{p['name']}' (ID: {p['id']})"
     except Exception as e:
         return f"Error creating project: {e}"
 
 
-@mcp.tool()
+@_tool()
 def update_project(project_id: str, name: str = "", color: str = "", is_favorite: bool = False) -> str:
     """
     Update an existing project.
@@ -174,15 +1304,16 @@ def update_project(project_id: str, name: str = "", color: str = "", is_favorite
     if not body:
         return "Nothing to update. Provide at least one of: name, color, is_favorite."
     try:
-        res = requests.post(f"{BASE_URL}/projects/{project_id}", headers=_headers(), json=body, timeout=REQUEST_TIMEOUT)
+        res = _mutate("POST", f"/projects/{project_id}", body)
         res.raise_for_status()
-        p = res.json()
+        p = _json(res)
+        _projects_index.add(p)
         return f"✅ Project updated: '{p['name']}' (ID: {p['id']})"
     except Exception as e:
         return f"Error updating project: {e}"
 
 
-@mcp.tool()
+@_tool()
 def delete_project(project_id: str) -> str:
     """
     Delete a project and all its tasks.
@@ -191,8 +1322,9 @@ def delete_project(project_id: str) -> str:
         project_id: ID of the project to delete.
     """
     try:
-        res = requests.delete(f"{BASE_URL}/projects/{project_id}", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _mutate("DELETE", f"/projects/{project_id}")
         res.raise_for_status()
+        _projects_index.remove(project_id)
         return f"✅ Project {project_id} deleted."
     except Exception as e:
         return f"Error deleting project: {e}"
@@ -202,8 +1334,8 @@ def delete_project(project_id: str) -> str:
 #  Tasks
 # ═══════════════════════════════════════════════
 
-@mcp.tool()
-def get_tasks(project_id: str = "", label: str = "", filter_str: str = "") -> str:
+@_tool()
+def get_tasks(project_id: str = "", label: str = "", filter_str: str = "", project: str = "") -> str:
     """
     Get all active tasks. Can filter by project, label, or Todoist filter string.
 
@@ -211,26 +1343,29 @@ def get_tasks(project_id: str = "", label: str = "", filter_str: str = "") -> st
         project_id: Optional project ID to filter tasks by.
         label: Optional label name to filter tasks by.
         filter_str: Optional Todoist filter string (e.g. 'today', 'overdue', 'p1').
+        project: Optional project name to filter by, instead of project_id (e.g. 'Work').
     """
-    params: dict = {}
-    if project_id:
-        params["project_id"] = project_id
-    if label:
-        params["label"] = label
-    if filter_str:
-        params["filter"] = filter_str
     try:
-        res = requests.get(f"{BASE_URL}/tasks", headers=_headers(), params=params, timeout=REQUEST_TIMEOUT)
+        params: dict = {}
+        project_id = _resolve_project(project_id, project)
+        if project_id:
+            params["project_id"] = project_id
+        if label:
+            params["label"] = _canonical_label(label)
+        if filter_str:
+            params["filter"] = filter_str
+        res = _get("/tasks", params)
         res.raise_for_status()
-        tasks = _extract_results(res.json())
+        tasks = _extract_results(_json(res))
         if not tasks:
             return "No active tasks found."
-        return "\n\n".join(_fmt_task(t) for t in tasks)
+        with _span("format", count=len(tasks)):
+            return "\n\n".join(_fmt_task(t) for t in tasks)
     except Exception as e:
         return f"Error getting tasks: {e}"
 
 
-@mcp.tool()
+@_tool()
 def get_task(task_id: str) -> str:
     """
     Get detailed information about a single task.
@@ -239,9 +1374,9 @@ def get_task(task_id: str) -> str:
         task_id: ID of the task.
     """
     try:
-        res = requests.get(f"{BASE_URL}/tasks/{task_id}", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _get(f"/tasks/{task_id}")
         res.raise_for_status()
-        t = res.json()
+        t = _json(res)
         lines = [_fmt_task(t)]
         lines.append(f"  📂 Project: {t.get('project_id', 'N/A')}")
         if t.get("section_id"):
@@ -255,7 +1390,7 @@ def get_task(task_id: str) -> str:
         return f"Error getting task: {e}"
 
 
-@mcp.tool()
+@_tool()
 def create_task(
     content: str,
     description: str = "",
@@ -266,6 +1401,9 @@ def create_task(
     due_date: str = "",
     priority: int = 1,
     labels: str = "",
+    project: str = "",
+    section: str = "",
+    warn_duplicates: bool = False,
 ) -> str:
     """
     Create a new task in Todoist.
@@ -280,34 +1418,58 @@ def create_task(
         due_date: Optional due date in YYYY-MM-DD format.
         priority: Priority from 1 (normal) to 4 (urgent). Default is 1.
         labels: Optional comma-separated label names (e.g. 'work,urgent').
+        project: Optional project name, instead of project_id (e.g. 'Work').
+        section: Optional section name, instead of section_id (e.g. 'Backlog').
+        warn_duplicates: If true, also list existing near-duplicates of the new task
+            (in the target project, or anywhere if no project is given).
     """
-    body: dict = {"content": content}
-    if description:
-        body["description"] = description
-    if project_id:
-        body["project_id"] = project_id
-    if section_id:
-        body["section_id"] = section_id
-    if parent_id:
-        body["parent_id"] = parent_id
-    if due_string:
-        body["due_string"] = due_string
-    if due_date:
-        body["due_date"] = due_date
-    if priority and priority != 1:
-        body["priority"] = priority
-    if labels:
-        body["labels"] = [l.strip() for l in labels.split(",")]
     try:
-        res = requests.post(f"{BASE_URL}/tasks", headers=_headers(), json=body, timeout=REQUEST_TIMEOUT)
+        body: dict = {"content": content}
+        if description:
+            body["description"] = description
+        project_id = _resolve_project(project_id, project)
+        if project_id:
+            body["project_id"] = project_id
+        section_id = _resolve_section(section_id, section, project_id)
+        if section_id:
+            body["section_id"] = section_id
+        if parent_id:
+            body["parent_id"] = parent_id
+        if due_string:
+            body["due_string"] = due_string
+        if due_date:
+            body["due_date"] = due_date
+        if priority and priority != 1:
+            body["priority"] = priority
+        if labels:
+            body["labels"] = [_canonical_label(l) for l in labels.split(",")]
+        similar = []
+        if warn_duplicates:
+            # Checked before the write, so the new task is not listed as its own duplicate.
+            existing = _get_all_tasks()
+            if project_id:
+                existing = [t for t in existing if str(t.get("project_id")) == project_id]
+            similar = _similar_tasks(content, existing, DUPLICATE_THRESHOLD)
+        res = _mutate("POST", "/tasks", body)
         res.raise_for_status()
-        t = res.json()
-        return f"✅ Task created: '{t['content']}' (ID: {t['id']})\n{_fmt_task(t)}"
+        t = _json(res)
+        where = []
+        if project:
+            where.append(f"project '{_projects_index.name_of(project_id)}'")
+        if section:
+            where.append(f"section '{_sections_index.name_of(section_id)}'")
+        placed = f" in {' / '.join(where)}" if where else ""
+        lines = [f"✅ Task created: '{t['content']}' (ID: {t['id']}){placed}\n{_fmt_task(t)}"]
+        if similar:
+            lines.append(f"\n⚠️ {len(similar)} similar task(s) already exist — check for a duplicate:\n")
+            for sim, dup in similar[:5]:
+                lines.append(f"{_fmt_task(dup)}\n  ≈ {sim:.0%} similar")
+        return "\n".join(lines)
     except Exception as e:
         return f"Error creating task: {e}"
 
 
-@mcp.tool()
+@_tool()
 def update_task(
     task_id: str,
     content: str = "",
@@ -345,15 +1507,15 @@ def update_task(
     if not body:
         return "Nothing to update. Provide at least one field."
     try:
-        res = requests.post(f"{BASE_URL}/tasks/{task_id}", headers=_headers(), json=body, timeout=REQUEST_TIMEOUT)
+        res = _mutate("POST", f"/tasks/{task_id}", body)
         res.raise_for_status()
-        t = res.json()
+        t = _json(res)
         return f"✅ Task updated: '{t['content']}' (ID: {t['id']})\n{_fmt_task(t)}"
     except Exception as e:
         return f"Error updating task: {e}"
 
 
-@mcp.tool()
+@_tool()
 def close_task(task_id: str) -> str:
     """
     Close (complete) a task.
@@ -362,14 +1524,14 @@ def close_task(task_id: str) -> str:
         task_id: ID of the task to close.
     """
     try:
-        res = requests.post(f"{BASE_URL}/tasks/{task_id}/close", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _mutate("POST", f"/tasks/{task_id}/close")
         res.raise_for_status()
         return f"✅ Task {task_id} completed."
     except Exception as e:
         return f"Error closing task: {e}"
 
 
-@mcp.tool()
+@_tool()
 def reopen_task(task_id: str) -> str:
     """
     Reopen a previously completed task.
@@ -378,14 +1540,14 @@ def reopen_task(task_id: str) -> str:
         task_id: ID of the task to reopen.
     """
     try:
-        res = requests.post(f"{BASE_URL}/tasks/{task_id}/reopen", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _mutate("POST", f"/tasks/{task_id}/reopen")
         res.raise_for_status()
         return f"✅ Task {task_id} reopened."
     except Exception as e:
         return f"Error reopening task: {e}"
 
 
-@mcp.tool()
+@_tool()
 def delete_task(task_id: str) -> str:
     """
     Permanently delete a task.
@@ -394,7 +1556,7 @@ def delete_task(task_id: str) -> str:
         task_id: ID of the task to delete.
     """
     try:
-        res = requests.delete(f"{BASE_URL}/tasks/{task_id}", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _mutate("DELETE", f"/tasks/{task_id}")
         res.raise_for_status()
         return f"✅ Task {task_id} deleted."
     except Exception as e:
@@ -405,7 +1567,7 @@ def delete_task(task_id: str) -> str:
 #  Sections
 # ═══════════════════════════════════════════════
 
-@mcp.tool()
+@_tool()
 def list_sections(project_id: str = "") -> str:
     """
     List sections, optionally filtered by project.
@@ -417,9 +1579,15 @@ def list_sections(project_id: str = "") -> str:
     if project_id:
         params["project_id"] = project_id
     try:
-        res = requests.get(f"{BASE_URL}/sections", headers=_headers(), params=params, timeout=REQUEST_TIMEOUT)
+        res = _get("/sections", params)
         res.raise_for_status()
-        sections = _extract_results(res.json())
+        data = _json(res)
+        sections = _extract_results(data)
+        if project_id:
+            for s in sections:
+                _sections_index.add(s)
+        else:
+            _sections_index.refresh(data, sections)
         if not sections:
             return "No sections found."
         lines = []
@@ -430,26 +1598,31 @@ def list_sections(project_id: str = "") -> str:
         return f"Error listing sections: {e}"
 
 
-@mcp.tool()
-def create_section(name: str, project_id: str) -> str:
+@_tool()
+def create_section(name: str, project_id: str = "", project: str = "") -> str:
     """
-    Create a new section within a project.
+    Create a new section within a project. Must provide either project_id or project.
 
     Args:
         name: Name of the section.
         project_id: ID of the project to create the section in.
+        project: Name of the project to create the section in, instead of project_id.
     """
-    body = {"name": name, "project_id": project_id}
+    if not project_id and not project:
+        return "Error: must provide either project_id or project."
     try:
-        res = requests.post(f"{BASE_URL}/sections", headers=_headers(), json=body, timeout=REQUEST_TIMEOUT)
+        body = {"name": name, "project_id": _resolve_project(project_id, project)}
+        res = _mutate("POST", "/sections", body)
         res.raise_for_status()
-        s = res.json()
-        return f"✅ Section created: '{s['name']}' (ID: {s['id']})"
+        s = _json(res)
+        _sections_index.add(s)
+        where = f" in project '{_projects_index.name_of(body['project_id'])}'" if project else ""
+        return f"✅ Section created: '{s['name']}' (ID: {s['id']}){where}"
     except Exception as e:
         return f"Error creating section: {e}"
 
 
-@mcp.tool()
+@_tool()
 def delete_section(section_id: str) -> str:
     """
     Delete a section and move its tasks to the parent project.
@@ -458,8 +1631,9 @@ def delete_section(section_id: str) -> str:
         section_id: ID of the section to delete.
     """
     try:
-        res = requests.delete(f"{BASE_URL}/sections/{section_id}", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _mutate("DELETE", f"/sections/{section_id}")
         res.raise_for_status()
+        _sections_index.remove(section_id)
         return f"✅ Section {section_id} deleted."
     except Exception as e:
         return f"Error deleting section: {e}"
@@ -469,15 +1643,17 @@ def delete_section(section_id: str) -> str:
 #  Labels
 # ═══════════════════════════════════════════════
 
-@mcp.tool()
+@_tool()
 def list_labels() -> str:
     """
     List all personal labels in the user's Todoist account.
     """
     try:
-        res = requests.get(f"{BASE_URL}/labels", headers=_headers(), timeout=REQUEST_TIMEOUT)
+        res = _get("/labels")
         res.raise_for_status()
-        labels = _extract_results(res.json())
+        data = _json(res)
+        labels = _extract_results(data)
+        _labels_index.refresh(data, labels)
         if not labels:
             return "No labels found."
         lines = []
@@ -489,7 +1665,7 @@ def list_labels() -> str:
         return f"Error listing labels: {e}"
 
 
-@mcp.tool()
+@_tool()
 def create_label(name: str, color: str = "") -> str:
     """
     Create a new personal label.
@@ -502,9 +1678,10 @@ def create_label(name: str, color: str = "") -> str:
     if color:
         body["color"] = color
     try:
-        res = requests.post(f"{BASE_URL}/labels", headers=_headers(), json=body, timeout=REQUEST_TIMEOUT)
+        res = _mutate("POST", "/labels", body)
         res.raise_for_status()
-        lb = res.json()
+        lb = _json(res)
+        _labels_index.add(lb)
         return f"✅ Label created: '{lb['name']}' (ID: {lb['id']})"
     except Exception as e:
         return f"Error creating label: {e}"
@@ -514,7 +1691,7 @@ def create_label(name: str, color: str = "") -> str:
 #  Comments
 # ═══════════════════════════════════════════════
 
-@mcp.tool()
+@_tool()
 def get_comments(task_id: str = "", project_id: str = "") -> str:
     """
     Get comments for a task or project. Must provide either task_id or project_id.
@@ -531,9 +1708,9 @@ def get_comments(task_id: str = "", project_id: str = "") -> str:
     if project_id:
         params["project_id"] = project_id
     try:
-        res = requests.get(f"{BASE_URL}/comments", headers=_headers(), params=params, timeout=REQUEST_TIMEOUT)
+        res = _get("/comments", params)
         res.raise_for_status()
-        comments = _extract_results(res.json())
+        comments = _extract_results(_json(res))
         if not comments:
             return "No comments found."
         lines = []
@@ -544,28 +1721,31 @@ def get_comments(task_id: str = "", project_id: str = "") -> str:
         return f"Error getting comments: {e}"
 
 
-@mcp.tool()
-def create_comment(content: str, task_id: str = "", project_id: str = "") -> str:
+@_tool()
+def create_comment(content: str, task_id: str = "", project_id: str = "", project: str = "") -> str:
     """
-    Add a comment to a task or project. Must provide either task_id or project_id.
+    Add a comment to a task or project. Must provide either task_id, project_id or project.
 
     Args:
         content: The comment text.
         task_id: ID of the task to comment on.
         project_id: ID of the project to comment on.
+        project: Name of the project to comment on, instead of project_id.
     """
-    if not task_id and not project_id:
-        return "Error: must provide either task_id or project_id."
-    body: dict = {"content": content}
-    if task_id:
-        body["task_id"] = task_id
-    if project_id:
-        body["project_id"] = project_id
+    if not task_id and not project_id and not project:
+        return "Error: must provide either task_id, project_id or project."
     try:
-        res = requests.post(f"{BASE_URL}/comments", headers=_headers(), json=body, timeout=REQUEST_TIMEOUT)
+        body: dict = {"content": content}
+        if task_id:
+            body["task_id"] = task_id
+        project_id = _resolve_project(project_id, project)
+        if project_id:
+            body["project_id"] = project_id
+        res = _mutate("POST", "/comments", body)
         res.raise_for_status()
-        c = res.json()
-        return f"✅ Comment added (ID: {c['id']}): {c['content']}"
+        c = _json(res)
+        where = f" on project '{_projects_index.name_of(project_id)}'" if project and not task_id else ""
+        return f"✅ Comment added (ID: {c['id']}){where}: {c['content']}"
     except Exception as e:
         return f"Error creating comment: {e}"
 
@@ -576,25 +1756,7 @@ def create_comment(content: str, task_id: str = "", project_id: str = "") -> str
 
 def _get_all_tasks() -> list:
     """Fetch all active tasks (handles pagination)."""
-    all_tasks = []
-    headers = _headers()
-    cursor = None
-    while True:
-        params: dict = {}
-        if cursor:
-            params["cursor"] = cursor
-        res = requests.get(f"{BASE_URL}/tasks", headers=headers, params=params, timeout=REQUEST_TIMEOUT)
-        res.raise_for_status()
-        data = res.json()
-        if isinstance(data, list):
-            all_tasks.extend(data)
-            break
-        results = data.get("results", [])
-        all_tasks.extend(results)
-        cursor = data.get("next_cursor")
-        if not cursor:
-            break
-    return all_tasks
+    return _get_all("/tasks")
 
 
 def _find_tasks_by_name(query: str) -> list:
@@ -604,7 +1766,7 @@ def _find_tasks_by_name(query: str) -> list:
     return [t for t in tasks if q in t.get("content", "").lower()]
 
 
-@mcp.tool()
+@_tool()
 def search_task_by_name(query: str) -> str:
     """
     Search for tasks by name using partial/fuzzy matching.
@@ -618,15 +1780,16 @@ def search_task_by_name(query: str) -> str:
         if not matches:
             return f"No tasks found matching '{query}'."
         lines = [f"Found {len(matches)} task(s) matching '{query}':\n"]
-        for t in matches:
-            lines.append(_fmt_task(t))
-            lines.append("")
-        return "\n".join(lines)
+        with _span("format", count=len(matches)):
+            for t in matches:
+                lines.append(_fmt_task(t))
+                lines.append("")
+            return "\n".join(lines)
     except Exception as e:
         return f"Error searching tasks: {e}"
 
 
-@mcp.tool()
+@_tool()
 def complete_task_by_name(task_name: str) -> str:
     """
     Complete a task by searching for it by name. Uses partial name matching.
@@ -646,14 +1809,14 @@ def complete_task_by_name(task_name: str) -> str:
                 lines.append("")
             return "\n".join(lines)
         task = matches[0]
-        res = requests.post(f"{BASE_URL}/tasks/{task['id']}/close", headers=_headers())
+        res = _mutate("POST", f"/tasks/{task['id']}/close")
         res.raise_for_status()
         return f"✅ Task completed: '{task['content']}' (ID: {task['id']})"
     except Exception as e:
         return f"Error completing task: {e}"
 
 
-@mcp.tool()
+@_tool()
 def delete_task_by_name(task_name: str) -> str:
     """
     Delete a task by searching for it by name. Uses partial name matching.
@@ -673,14 +1836,14 @@ def delete_task_by_name(task_name: str) -> str:
                 lines.append("")
             return "\n".join(lines)
         task = matches[0]
-        res = requests.delete(f"{BASE_URL}/tasks/{task['id']}", headers=_headers())
+        res = _mutate("DELETE", f"/tasks/{task['id']}")
         res.raise_for_status()
         return f"✅ Task deleted: '{task['content']}' (ID: {task['id']})"
     except Exception as e:
         return f"Error deleting task: {e}"
 
 
-@mcp.tool()
+@_tool()
 def update_task_by_name(
     task_name: str,
     content: str = "",
@@ -721,19 +1884,1023 @@ def update_task_by_name(
             body["priority"] = priority
         if not body:
             return "Nothing to update. Provide at least one of: content, description, due_string, priority."
-        res = requests.post(f"{BASE_URL}/tasks/{task['id']}", headers=_headers(), json=body)
+        res = _mutate("POST", f"/tasks/{task['id']}", body)
         res.raise_for_status()
-        t = res.json()
+        t = _json(res)
         return f"✅ Task updated: '{t['content']}' (ID: {t['id']})\n{_fmt_task(t)}"
     except Exception as e:
         return f"Error updating task: {e}"
 
 
+# ═══════════════════════════════════════════════
+#  Sub-task Trees
+# ═══════════════════════════════════════════════
+#
+# A task's subtree is built from one bulk task fetch via a parent → children
+# index, and tree-wide changes are sent as a single batched Sync API request
+# instead of one call per subtask.
+
+def _children_index(tasks: list) -> dict:
+    """Map parent task ID → its direct subtasks, in Todoist's display order."""
+    children: dict = {}
+    for t in tasks:
+        if t.get("parent_id"):
+            children.setdefault(str(t["parent_id"]), []).append(t)
+    for kids in children.values():
+        kids.sort(key=lambda t: t.get("child_order", 0))
+    return children
+
+
+def _task_subtree(task_id: str) -> tuple[dict, dict]:
+    """Return (root task, children index) for an active task, from one bulk fetch."""
+    tasks = _get_all_tasks()
+    root = next((t for t in tasks if str(t["id"]) == task_id), None)
+    if root is None:
+        raise ValueError(f"no active task with ID {task_id}")
+    return root, _children_index(tasks)
+
+
+def _walk_subtree(root: dict, children: dict, depth: int = 0):
+    """Yield (depth, task) for root and its descendants, parents before children."""
+    stack = [(depth, root)]
+    while stack:
+        d, t = stack.pop()
+        yield d, t
+        stack.extend((d + 1, c) for c in reversed(children.get(str(t["id"]), [])))
+
+
+def _sync_failures(result: dict) -> int:
+    return sum(1 for st in result.get("sync_status", {}).values() if st != "ok")
+
+
+@_tool()
+def get_task_tree(task_id: str) -> str:
+    """
+    Get a task together with all of its subtasks (recursively), e.g. to read a checklist.
+
+    Args:
+        task_id: ID of the parent task.
+    """
+    try:
+        root, children = _task_subtree(task_id)
+        nodes = list(_walk_subtree(root, children))
+        lines = [f"🌳 Task tree ({len(nodes) - 1} subtask(s)):\n"]
+        with _span("format", count=len(nodes)):
+            for depth, t in nodes:
+                lines.append("\n".join("    " * depth + line for line in _fmt_task(t).split("\n")))
+            return "\n".join(lines)
+    except Exception as e:
+        return f"Error getting task tree: {e}"
+
+
+@_tool()
+def close_task_tree(task_id: str) -> str:
+    """
+    Complete a task and all of its subtasks (one request per 100 tasks).
+
+    Args:
+        task_id: ID of the parent task.
+    """
+    try:
+        root, children = _task_subtree(task_id)
+        nodes = [t for _, t in _walk_subtree(root, children)]
+        # Children first, so nothing is left open under an already-closed parent.
+        commands = [{"type": "item_close", "uuid": str(uuid.uuid4()), "args": {"id": t["id"]}} for t in reversed(nodes)]
+        batches = [commands[i:i + SYNC_BATCH_SIZE] for i in range(0, len(commands), SYNC_BATCH_SIZE)]
+        failed, queued, keys = 0, 0, []
+        # Every batch is sent (or queued) even if an earlier one is left in the outbox,
+        # so the root — in the last batch — is never silently dropped.
+        for batch in batches:
+            try:
+                failed += _sync_failures(_sync_commands(batch))
+            except _Pending as e:
+                queued += len(batch)
+                keys.append(e.key)
+        if queued:
+            return (f"⏳ Completed {len(nodes) - queued - failed} of {len(nodes)} task(s) in the tree of "
+                    f"'{root['content']}'; {queued} more are queued in {len(keys)} batch(es) and will be "
+                    f"delivered automatically (keys {', '.join(keys)}). Do not repeat this call.")
+        if failed:
+            return f"⚠️ Completed {len(nodes) - failed} of {len(nodes)} task(s) in the tree of '{root['content']}'."
+        return f"✅ Completed '{root['content']}' and {len(nodes) - 1} subtask(s)."
+    except Exception as e:
+        return f"Error closing task tree: {e}"
+
+
+@_tool()
+def move_task_tree(
+    task_id: str,
+    project_id: str = "",
+    section_id: str = "",
+    parent_id: str = "",
+    project: str = "",
+    section: str = "",
+) -> str:
+    """
+    Move a task with all of its subtasks to another project, section or parent task.
+    Provide exactly one destination; `project` may accompany `section` to scope the name lookup.
+
+    Args:
+        task_id: ID of the parent task to move.
+        project_id: Destination project ID.
+        section_id: Destination section ID.
+        parent_id: Destination parent task ID (makes the tree a subtree of that task).
+        project: Destination project name, instead of project_id.
+        section: Destination section name, instead of section_id (scoped to `project` if given).
+    """
+    # A project name may scope a section name; any other pairing is two destinations.
+    given = [name for name, value in (
+        ("section", section_id or section),
+        ("parent", parent_id),
+        ("project", (project_id or project) if not (section and not section_id) else ""),
+    ) if value]
+    if len(given) != 1:
+        if not given:
+            return "Error: provide a destination (project, section or parent)."
+        return f"Error: provide exactly one destination, got {', '.join(given)}."
+    try:
+        project_id = _resolve_project(project_id, project)
+        section_id = _resolve_section(section_id, section, project_id if section else "")
+        if section_id:
+            dest, where = {"section_id": section_id}, f"section {section_id}"
+        elif parent_id:
+            dest, where = {"parent_id": parent_id}, f"parent task {parent_id}"
+        else:
+            dest, where = {"project_id": project_id}, f"project {project_id}"
+        # Subtasks follow their parent, so one item_move moves the whole tree.
+        result = _sync_commands([{"type": "item_move", "uuid": str(uuid.uuid4()), "args": {"id": task_id, **dest}}])
+        if _sync_failures(result):
+            return f"Error moving task tree: {list(result['sync_status'].values())[0]}"
+        return f"✅ Moved task {task_id} and its subtasks to {where}."
+    except Exception as e:
+        return f"Error moving task tree: {e}"
+
+
+@_tool()
+def delete_task_tree(task_id: str) -> str:
+    """
+    Permanently delete a task together with all of its subtasks.
+
+    Args:
+        task_id: ID of the parent task to delete.
+    """
+    try:
+        root, children = _task_subtree(task_id)
+        count = sum(1 for _ in _walk_subtree(root, children))
+        # Deleting a parent deletes its subtasks, so one command covers the tree.
+        result = _sync_commands([{"type": "item_delete", "uuid": str(uuid.uuid4()), "args": {"id": task_id}}])
+        if _sync_failures(result):
+            return f"Error deleting task tree: {list(result['sync_status'].values())[0]}"
+        return f"✅ Deleted '{root['content']}' and {count - 1} subtask(s)."
+    except Exception as e:
+        return f"Error deleting task tree: {e}"
+
+
+# ═══════════════════════════════════════════════
+#  Agenda (today / overdue / upcoming)
+# ═══════════════════════════════════════════════
+#
+# Tasks are bucketed once by their effective date — the earlier of the due
+# date and the deadline, in the requested timezone — and the index is reused
+# until it expires. Tasks created or updated through this server are applied
+# to it in place; other writes that can change tasks (closing, deleting,
+# moving, deleting a project or section, or a write left queued) drop it.
+# Writes to labels, comments and projects leave it alone. A query only visits
+# the buckets inside its date window and picks the top K with a heap instead
+# of sorting. Without an explicit timezone, the account's Todoist timezone is
+# used, so floating due times follow its DST rules.
+
+class _AgendaIndex:
+    """Due-date bucketed index over active tasks for one timezone."""
+
+    def __init__(self, tasks: list, tz):
+        self.tz = tz
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.buckets: dict = {}
+        self.dates: dict = {}  # task id -> the bucket it is in
+        for t in tasks:
+            self._add(t)
+        self.days = sorted(self.buckets)
+
+    def _add(self, t: dict) -> tuple | None:
+        entry = _agenda_entry(t, self.tz)
+        if entry:
+            self.buckets.setdefault(entry[1], []).append(entry)
+            self.dates[str(t["id"])] = entry[1]
+        return entry
+
+    def upsert(self, t: dict) -> None:
+        """Apply a created or updated task in place."""
+        task_id = str(t["id"])
+        with self.lock:
+            day = self.dates.pop(task_id, None)
+            if day is not None:
+                self.buckets[day] = [e for e in self.buckets[day] if str(e[2]["id"]) != task_id]
+                if not self.buckets[day]:
+                    del self.buckets[day]
+                    self.days.remove(day)
+            entry = self._add(t)
+            if entry and len(self.buckets[entry[1]]) == 1:
+                bisect.insort(self.days, entry[1])
+
+    def select(self, start, end, limit: int) -> list:
+        """Top `limit` entries with start <= date <= end (None = open-ended)."""
+        with self.lock:
+            lo = 0 if start is None else bisect.bisect_left(self.days, start)
+            hi = len(self.days) if end is None else bisect.bisect_right(self.days, end)
+            candidates = (e for d in self.days[lo:hi] for e in self.buckets[d])
+            return heapq.nsmallest(limit, candidates, key=lambda e: e[0])
+
+
+_agenda_index: _AgendaIndex | None = None
+_account_tz = None  # the account's Todoist timezone, looked up once per token
+
+
+def _invalidate_task_caches() -> None:
+    """Drop cached task views."""
+    global _agenda_index
+    _agenda_index = None
+
+
+def _after_write(method: str, path: str, res: requests.Response | None) -> None:
+    """
+    Keep cached task views in step with a write; `res` is None if the write was
+    left queued or has just been replayed. A created or updated task is applied to the agenda index in
+    place; any other write that can change tasks drops the index.
+    """
+    if not (path.startswith(("/tasks", "/sync")) or (method == "DELETE" and path.startswith(("/projects/", "/sections/")))):
+        return
+    index = _agenda_index
+    if index is not None and res is not None and res.ok and method == "POST" and re.fullmatch(r"/tasks(/[^/]+)?", path):
+        index.upsert(_json(res))
+    else:
+        _invalidate_task_caches()
+
+
+def _parse_due_moment(value: str, tz) -> datetime.datetime | None:
+    """Parse a Todoist date or datetime string into an aware datetime in tz."""
+    if not value:
+        return None
+    try:
+        if "T" not in value:
+            d = datetime.date.fromisoformat(value[:10])
+            return datetime.datetime(d.year, d.month, d.day, 23, 59, 59, tzinfo=tz)
+        dt = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # Floating datetimes (no offset) are wall-clock times in the user's timezone.
+    return dt.astimezone(tz) if dt.tzinfo else dt.replace(tzinfo=tz)
+
+
+def _agenda_entry(t: dict, tz) -> tuple | None:
+    """Build (rank_key, date, task) for a dated task, or None if it has no date."""
+    due = t.get("due") or {}
+    moments = [
+        _parse_due_moment(due.get("datetime") or due.get("date") or "", tz),
+        _parse_due_moment((t.get("deadline") or {}).get("date", ""), tz),
+    ]
+    moments = [m for m in moments if m]
+    if not moments:
+        return None
+    when = min(moments)
+    # Highest priority first, then the soonest due/deadline, then the oldest task.
+    key = (-t.get("priority", 1), when.timestamp(), t.get("added_at") or "", str(t.get("id")))
+    return key, when.date(), t
+
+
+def _local_zone():
+    """The server's IANA zone (from TZ or /etc/localtime), or None if it can't be named."""
+    name = os.environ.get("TZ", "").lstrip(":")
+    if not name:
+        with contextlib.suppress(OSError):
+            target = os.path.realpath("/etc/localtime")
+            name = target.split("zoneinfo/", 1)[1] if "zoneinfo/" in target else ""
+    try:
+        return zoneinfo.ZoneInfo(name) if name else None
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def _resolve_tz(name: str):
+    """`name`, else the account's Todoist timezone, else the server's local zone."""
+    global _account_tz
+    if name:
+        return zoneinfo.ZoneInfo(name)
+    if _account_tz is None:
+        meta: dict = {}
+        try:
+            for _ in _sync_read("*", ["user"], meta):
+                pass
+        except requests.RequestException:
+            # Not cached, so the next call asks again.
+            return _local_zone() or datetime.datetime.now().astimezone().tzinfo
+        try:
+            _account_tz = zoneinfo.ZoneInfo(meta["user"]["tz_info"]["timezone"])
+        except (KeyError, TypeError, ValueError, zoneinfo.ZoneInfoNotFoundError):
+            _account_tz = _local_zone() or datetime.datetime.now().astimezone().tzinfo
+    return _account_tz
+
+
+def _get_agenda_index(tz) -> _AgendaIndex:
+    global _agenda_index
+    index = _agenda_index
+    if index is None or index.tz != tz or time.monotonic() - index.built_at > AGENDA_TTL:
+        tasks = _get_all_tasks()
+        with _span("agenda.build", count=len(tasks)):
+            index = _agenda_index = _AgendaIndex(tasks, tz)
+    return index
+
+
+@_tool()
+def get_agenda(view: str = "today", days: int = 7, limit: int = 10, timezone: str = "") -> str:
+    """
+    Get the most urgent tasks for an agenda view, ranked by priority, then the
+    nearest due date/deadline, then task age. Faster and more compact than get_tasks
+    for questions like "what's due today" or "top 10 urgent things this week".
+
+    Args:
+        view: 'today', 'overdue', 'upcoming' (after today, within `days`), or 'all' (overdue through `days`).
+        days: Size of the look-ahead window in days for 'upcoming' and 'all'. Default is 7.
+        limit: Maximum number of tasks to return. Default is 10.
+        timezone: Optional IANA timezone (e.g. 'Asia/Shanghai'). Defaults to the timezone set in the Todoist account.
+    """
+    try:
+        tz = _resolve_tz(timezone)
+        today = datetime.datetime.now(tz).date()
+        horizon = today + datetime.timedelta(days=max(days, 0))
+        windows = {
+            "today": (today, today),
+            "overdue": (None, today - datetime.timedelta(days=1)),
+            "upcoming": (today + datetime.timedelta(days=1), horizon),
+            "all": (None, horizon),
+        }
+        if view not in windows:
+            return f"Error: unknown view '{view}'. Use one of: {', '.join(windows)}."
+        start, end = windows[view]
+        index = _get_agenda_index(tz)
+        with _span("agenda.select", view=view, limit=limit):
+            entries = index.select(start, end, max(limit, 1))
+        if not entries:
+            return f"No tasks for agenda view '{view}'."
+        lines = [f"📋 Agenda '{view}' — top {len(entries)} task(s):\n"]
+        with _span("format", count=len(entries)):
+            for _, day, t in entries:
+                marker = "❗ overdue" if day < today else ("today" if day == today else day.isoformat())
+                lines.append(f"{_fmt_task(t)}\n  ⏳ {marker}")
+                lines.append("")
+            return "\n".join(lines)
+    except Exception as e:
+        return f"Error getting agenda: {e}"
+
+
+# ═══════════════════════════════════════════════
+#  Near-Duplicate Detection
+# ═══════════════════════════════════════════════
+#
+# Task titles are turned into character 3-gram shingles and MinHash
+# signatures. Locality-sensitive hashing (bands of rows) puts likely
+# duplicates into shared buckets, so only those candidate pairs get an exact
+# Jaccard check — roughly linear in the number of tasks instead of all pairs.
+# The band/row split is chosen per call from the threshold, so lowering the
+# threshold widens the candidate net instead of silently missing pairs.
+
+MINHASH_PERMUTATIONS = 64
+LSH_RECALL = 0.95  # minimum chance that a pair exactly at the threshold becomes a candidate
+DUPLICATE_THRESHOLD = 0.6
+MIN_DUPLICATE_THRESHOLD = 0.3  # below this nearly every pair is a candidate and LSH stops paying off
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(20240101)
+_MINHASH_PARAMS = [
+    (_minhash_rng.randrange(1, _MERSENNE_PRIME), _minhash_rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def _shingles(text: str) -> frozenset:
+    """Character 3-grams of a normalized title (short titles are a single shingle)."""
+    norm = _normalize_name(text)
+    if len(norm) < 3:
+        return frozenset([norm]) if norm else frozenset()
+    return frozenset(norm[i:i + 3] for i in range(len(norm) - 2))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _minhash(shingles: frozenset) -> tuple:
+    hashes = [hash(sh) & _MERSENNE_PRIME for sh in shingles]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _MINHASH_PARAMS)
+
+
+def _lsh_shape(threshold: float) -> tuple[int, int]:
+    """
+    (bands, rows) with the most rows per band — the fewest false candidates — for which
+    a pair at `threshold` similarity still shares a bucket with probability ≥ LSH_RECALL.
+    """
+    for rows in range(MINHASH_PERMUTATIONS, 0, -1):
+        bands = MINHASH_PERMUTATIONS // rows
+        if 1 - (1 - threshold ** rows) ** bands >= LSH_RECALL:
+            return bands, rows
+    return MINHASH_PERMUTATIONS, 1
+
+
+def _duplicate_clusters(tasks: list, threshold: float) -> list:
+    """Group near-duplicate tasks. Returns [(best_similarity, [tasks])], most similar first."""
+    shingles = [_shingles(t.get("content", "")) for t in tasks]
+    bands, rows = _lsh_shape(threshold)
+    buckets: dict = {}
+    for i, sh in enumerate(shingles):
+        if not sh:
+            continue
+        sig = _minhash(sh)
+        for band in range(bands):
+            buckets.setdefault((band, sig[band * rows:(band + 1) * rows]), []).append(i)
+
+    parent = list(range(len(tasks)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    best: dict = {}
+    checked = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                sim = _jaccard(shingles[pair[0]], shingles[pair[1]])
+                if sim >= threshold:
+                    parent[find(pair[0])] = find(pair[1])
+                    for i in pair:
+                        best[i] = max(best.get(i, 0.0), sim)
+
+    groups: dict = {}
+    for i in best:
+        groups.setdefault(find(i), []).append(i)
+    clusters = [(max(best[i] for i in idx), [tasks[i] for i in idx]) for idx in groups.values()]
+    clusters.sort(key=lambda c: (-c[0], -len(c[1])))
+    return clusters
+
+
+def _similar_tasks(content: str, tasks: list, threshold: float) -> list:
+    """Existing tasks whose title is at least `threshold` similar to content, most similar first."""
+    target = _shingles(content)
+    scored = [(_jaccard(target, _shingles(t.get("content", ""))), t) for t in tasks]
+    return sorted(((s, t) for s, t in scored if s >= threshold), key=lambda st: -st[0])
+
+
+@_tool()
+def find_duplicate_tasks(
+    project_id: str = "",
+    label: str = "",
+    threshold: float = DUPLICATE_THRESHOLD,
+    limit: int = 20,
+    project: str = "",
+) -> str:
+    """
+    Find groups of active tasks with near-identical titles (likely duplicates).
+    Scans all active tasks, or only those in a project / with a label.
+
+    Args:
+        project_id: Optional project ID to limit the search to.
+        label: Optional label name to limit the search to.
+        threshold: Minimum title similarity from 0.3 to 1 (default 0.6; 1 means identical).
+        limit: Maximum number of duplicate groups to return. Default is 20.
+        project: Optional project name, instead of project_id.
+    """
+    limit = max(limit, 1)
+    try:
+        project_id = _resolve_project(project_id, project)
+        tasks = _get_all_tasks()
+        if project_id:
+            tasks = [t for t in tasks if str(t.get("project_id")) == project_id]
+        if label:
+            wanted = _normalize_name(label)
+            tasks = [t for t in tasks if wanted in {_normalize_name(lb) for lb in t.get("labels", [])}]
+        note = ""
+        if not MIN_DUPLICATE_THRESHOLD <= threshold <= 1:
+            clamped = min(max(threshold, MIN_DUPLICATE_THRESHOLD), 1.0)
+            note = f" (threshold {threshold:g} is outside 0.3–1; used {clamped:g})"
+            threshold = clamped
+        with _span("duplicates.cluster", count=len(tasks)):
+            clusters = _duplicate_clusters(tasks, threshold)
+        if not clusters:
+            return f"No near-duplicate tasks found among {len(tasks)} task(s){note}."
+        lines = [f"Found {len(clusters)} group(s) of near-duplicate tasks among {len(tasks)} task(s){note}:\n"]
+        for n, (sim, members) in enumerate(clusters[:limit], 1):
+            lines.append(f"#{n} — {sim:.0%} similar, {len(members)} tasks:")
+            lines.extend(_fmt_task(t) for t in members)
+            lines.append("")
+        if len(clusters) > limit:
+            lines.append(f"… {len(clusters) - limit} more group(s) not shown.")
+        return "\n".join(lines)
+    except Exception as e:
+        return f"Error finding duplicate tasks: {e}"
+
+
+# ═══════════════════════════════════════════════
+#  Account Export / Import
+# ═══════════════════════════════════════════════
+#
+# Exports stream projects, sections, labels and tasks page by page, then every
+# comment from one Sync read of notes / project_notes (rather than a comments
+# request per task and project), into gzip-compressed JSON lines
+# ({"type": ..., "data": {...}}), so the account is never held in memory. Imports replay a file as batched Sync API
+# commands; old IDs are mapped to temp IDs inside a batch and to the real IDs
+# Todoist returns once the batch is applied. Items whose parent appears later
+# in the file wait until that parent has been queued.
+#
+# The MCP tools only read and write files inside EXPORT_DIR and never overwrite
+# an existing export; the todoist-mcp-backup CLI accepts any path.
+
+EXPORT_DIR = os.path.join(STATE_DIR, "exports")
+EXPORT_FORMAT = "todoist-mcp-export"
+EXPORT_VERSION = 1
+SYNC_BATCH_SIZE = 100  # commands per /sync request
+
+
+def _export_records():
+    """Yield (type, data) for every object in the account, one API page at a time."""
+    for p in _iter_pages("/projects"):
+        yield "project", p
+    for s in _iter_pages("/sections"):
+        yield "section", s
+    for lb in _iter_pages("/labels"):
+        yield "label", lb
+    for t in _iter_pages("/tasks"):
+        yield "task", t
+    for _, c in _sync_read("*", ["notes", "project_notes"], {}):
+        if not c.get("is_deleted"):
+            yield "comment", c
+
+
+def _export_account(path: str) -> collections.Counter:
+    """Stream the whole account to a .jsonl.gz file. Returns per-type counts."""
+    counts: collections.Counter = collections.Counter()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".part"
+    try:
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            header = {"type": "header", "format": EXPORT_FORMAT, "version": EXPORT_VERSION,
+                      "exported_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}
+            f.write(json.dumps(header) + "\n")
+            for kind, data in _export_records():
+                f.write(json.dumps({"type": kind, "data": data}, ensure_ascii=False) + "\n")
+                counts[kind] += 1
+            f.write(json.dumps({"type": "footer", "counts": counts}) + "\n")
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+    return counts
+
+
+def _read_export(path: str):
+    """Yield (type, data) records from an export file, validating its header."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != EXPORT_FORMAT:
+            raise ValueError(f"{path} is not a Todoist MCP export")
+        if header.get("version", 0) > EXPORT_VERSION:
+            raise ValueError(f"export version {header['version']} is newer than supported ({EXPORT_VERSION})")
+        for line in f:
+            rec = json.loads(line)
+            if rec["type"] not in ("header", "footer"):
+                yield rec["type"], rec["data"]
+
+
+class _AccountImporter:
+    """
+    Replays exported records as batched Sync API commands with ID remapping.
+    Progress is saved to a journal after every batch (and when one fails or is
+    left queued), so importing the same file again after an interruption of any
+    kind resumes instead of creating duplicates.
+    """
+
+    # Fields that point at other exported objects, per record type.
+    REFS = {
+        "project": ("parent_id",),
+        "section": ("project_id",),
+        "task": ("project_id", "section_id", "parent_id"),
+        "comment": ("task_id", "item_id", "project_id"),
+    }
+
+    def __init__(self, journal: str = ""):
+        self.ids: dict = {}  # old id → new id (or temp id while its batch is unsent)
+        self.done: dict = {}  # old id → new id (None if it failed) for every record already sent
+        self.batch: list = []
+        self.unsent: dict = {}  # old id → temp id for the current batch
+        self.batch_counts: collections.Counter = collections.Counter()
+        self.waiting: dict = {}  # missing old id → records that reference it
+        self.counts: collections.Counter = collections.Counter()
+        self.failed = 0
+        self.journal = journal
+        self.receipt = journal + ".receipt" if journal else ""
+        if journal:
+            self._resume()
+        self.existing_labels = {_normalize_name(lb["name"]) for lb in _iter_pages("/labels")}
+        self.inbox_id = next((p["id"] for p in _iter_pages("/projects") if p.get("inbox_project")), None)
+
+    def _resume(self) -> None:
+        """Pick up a previous, interrupted import of the same file into the same account."""
+        try:
+            with open(self.journal, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("account") != _token_fingerprint():
+            return
+        queued = state.get("queued", {})
+        if queued:
+            # The queued batch must land first; its replay leaves the new IDs in the receipt.
+            if not os.path.exists(self.receipt):
+                _replay_outbox()
+            try:
+                with open(self.receipt, encoding="utf-8") as f:
+                    mapping = json.load(f).get("temp_id_mapping", {})
+            except (OSError, ValueError):
+                if any(op["key"] == state["key"] for op in _outbox_pending()):
+                    raise _Pending("the previous import batch is still queued", state["key"])
+                mapping = {}  # rejected: its records were not created
+            for old, temp in queued.items():
+                state["done"][old] = mapping.get(temp)
+                state["failed"] += temp not in mapping
+            with contextlib.suppress(OSError):
+                os.remove(self.receipt)
+        self.done = state["done"]
+        self.ids.update(self.done)
+        self.counts.update(state["counts"])
+        self.failed = state["failed"]
+
+    def _save(self, key: str = "") -> None:
+        """Record progress; `key` is the outbox key of a batch left queued by a failed flush."""
+        counts = self.counts if key else self.counts - self.batch_counts  # a refused batch is retried
+        state = {"account": _token_fingerprint(), "key": key, "done": self.done,
+                 "queued": self.unsent if key else {}, "counts": counts, "failed": self.failed}
+        with open(self.journal + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(self.journal + ".tmp", self.journal)
+
+    def add(self, kind: str, data: dict) -> None:
+        if data.get("id") in self.done:
+            return  # created by an earlier, interrupted run
+        missing = next((data[f] for f in self.REFS.get(kind, ()) if data.get(f) and data[f] not in self.ids), None)
+        if missing is not None:
+            self.waiting.setdefault(missing, []).append((kind, data))
+            return
+        self._queue(kind, data)
+
+    def _ref(self, data: dict, field: str):
+        return self.ids.get(data.get(field)) if data.get(field) else None
+
+    def _command(self, kind: str, data: dict) -> tuple[str, dict] | None:
+        if kind == "project":
+            if data.get("inbox_project"):
+                self.ids[data["id"]] = self.inbox_id
+                return None
+            args = {k: data[k] for k in ("name", "color", "is_favorite", "view_style") if data.get(k)}
+            if self._ref(data, "parent_id"):
+                args["parent_id"] = self._ref(data, "parent_id")
+            return "project_add", args
+        if kind == "section":
+            return "section_add", {"name": data["name"], "project_id": self._ref(data, "project_id")}
+        if kind == "label":
+            if _normalize_name(data["name"]) in self.existing_labels:
+                return None
+            return "label_add", {k: data[k] for k in ("name", "color", "is_favorite") if data.get(k)}
+        if kind == "task":
+            args = {k: data[k] for k in ("content", "description", "priority", "labels", "deadline", "duration")
+                    if data.get(k)}
+            if data.get("due"):
+                args["due"] = {k: v for k, v in data["due"].items() if k in ("date", "string", "lang", "timezone")}
+            for field in ("project_id", "section_id", "parent_id"):
+                if self._ref(data, field):
+                    args[field] = self._ref(data, field)
+            return "item_add", args
+        if kind == "comment":
+            args = {"content": data.get("content", "")}
+            if data.get("file_attachment"):
+                args["file_attachment"] = data["file_attachment"]
+            task_ref = self._ref(data, "task_id") or self._ref(data, "item_id")
+            if task_ref:
+                args["item_id"] = task_ref
+            elif self._ref(data, "project_id"):
+                args["project_id"] = self._ref(data, "project_id")
+            else:
+                self.failed += 1  # its task or project was not imported
+                return None
+            return "note_add", args
+        return None
+
+    def _queue(self, kind: str, data: dict) -> None:
+        cmd = self._command(kind, data)
+        if cmd is not None:
+            temp_id = str(uuid.uuid4())
+            self.batch.append({"type": cmd[0], "uuid": str(uuid.uuid4()), "temp_id": temp_id, "args": cmd[1]})
+            self.ids[data["id"]] = temp_id
+            self.unsent[data["id"]] = temp_id
+            self.counts[kind] += 1
+            self.batch_counts[kind] += 1
+        for kind2, data2 in self.waiting.pop(data["id"], []):
+            self.add(kind2, data2)
+        if len(self.batch) >= SYNC_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        try:
+            result = _sync_commands(self.batch, self.receipt)
+        except BaseException as e:
+            if self.journal:
+                self._save(e.key if isinstance(e, _Pending) else "")
+            raise
+        mapping = result.get("temp_id_mapping", {})
+        for old, temp in self.unsent.items():
+            if temp in mapping:
+                self.ids[old] = mapping[temp]
+            self.done[old] = mapping.get(temp)
+        self.failed += _sync_failures(result)
+        self.batch, self.unsent, self.batch_counts = [], {}, collections.Counter()
+        if self.journal:
+            with contextlib.suppress(OSError):  # a read-only directory costs resumability, not the import
+                self._save()
+
+    def finish(self) -> None:
+        """Queue records whose references never appeared (dropping those references), then flush."""
+        while self.waiting:
+            missing, records = self.waiting.popitem()
+            self.ids.setdefault(missing, None)
+            for kind, data in records:
+                self.add(kind, data)
+        self.flush()
+        if self.journal:
+            with contextlib.suppress(OSError):
+                os.remove(self.journal)
+
+
+def _import_account(path: str) -> tuple[collections.Counter, int]:
+    """
+    Replay an export file into the current account. Returns (created counts, failed commands).
+    Resumes from `<path>.import` if an earlier import of this file was interrupted.
+    """
+    importer = _AccountImporter(path + ".import")  # raises _Pending if the last run's batch is still queued
+    try:
+        for kind, data in _read_export(path):
+            importer.add(kind, data)
+        importer.finish()
+    except _Pending as e:
+        raise _Pending(f"{len(importer.done)} record(s) imported, a batch of {len(importer.unsent)} queued", e.key) from None
+    return importer.counts, importer.failed
+
+
+def _fmt_counts(counts: collections.Counter) -> str:
+    return ", ".join(f"{n} {kind}(s)" for kind, n in counts.items()) or "nothing"
+
+
+def _export_file(path: str) -> str:
+    """Resolve a tool-supplied export path, refusing anything outside EXPORT_DIR."""
+    root = os.path.realpath(EXPORT_DIR)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root or full == root:
+        raise ValueError(f"export files must be inside {EXPORT_DIR} (got '{path}')")
+    return full
+
+
+def _run_export(path: str) -> str:
+    start = time.perf_counter()
+    counts = _export_account(path)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    return (f"✅ Exported {_fmt_counts(counts)} to {path} "
+            f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} records/s).")
+
+
+def _run_import(path: str) -> str:
+    start = time.perf_counter()
+    try:
+        counts, failed = _import_account(path)
+    except _Pending as e:
+        return (f"⚠️ Import paused: {e} for delivery (key {e.key}). Run flush_outbox, then import the "
+                f"same file again to resume — records already imported are skipped, not duplicated.")
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    msg = (f"✅ Imported {_fmt_counts(counts)} from {path} "
+           f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} records/s).")
+    if failed:
+        msg += f"\n⚠️ {failed} record(s) could not be imported."
+    return msg
+
+
+@_tool()
+def export_account(path: str = "") -> str:
+    """
+    Export the whole account (projects, sections, labels, active tasks and comments)
+    to a compressed JSON-lines file in the server's exports directory, e.g. for backups.
+
+    Args:
+        path: Optional file name (.jsonl.gz) inside the exports directory. Defaults to a timestamped name.
+            Existing files are never overwritten.
+    """
+    try:
+        path = _export_file(path or f"todoist-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz")
+        if os.path.exists(path):
+            return f"Error exporting account: {path} already exists; choose another file name."
+        return _run_export(path)
+    except Exception as e:
+        return f"Error exporting account: {e}"
+
+
+@_tool()
+def import_account(path: str) -> str:
+    """
+    Import an export file created by export_account into the current account.
+    Objects are created as new copies (IDs are remapped); existing labels are reused.
+
+    Args:
+        path: File name of the .jsonl.gz export inside the server's exports directory.
+    """
+    try:
+        return _run_import(_export_file(path))
+    except Exception as e:
+        return f"Error importing account: {e}"
+
+
+# ═══════════════════════════════════════════════
+#  Change Feed (incremental sync)
+# ═══════════════════════════════════════════════
+#
+# Each client keeps a checkpoint — the Sync API sync_token of its last look —
+# under CHECKPOINT_DIR. The next call asks Todoist for only what changed since
+# that token and returns it as a compact delta, instead of re-reading and
+# diffing every task. The checkpoint also lists the IDs that existed at that
+# point, so a changed object is "added" exactly when its ID is new — no clock
+# comparison between this machine and Todoist's servers.
+
+CHECKPOINT_DIR = os.path.join(STATE_DIR, "checkpoints")
+CHANGE_RESOURCES = ["items", "projects", "notes", "project_notes"]
+CHANGE_TITLES = {"items": "Tasks", "projects": "Projects", "notes": "Comments", "project_notes": "Comments"}
+
+
+def _checkpoint_path(client_id: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, re.sub(r"[^A-Za-z0-9_.-]", "_", client_id or "default") + ".json")
+
+
+def _load_checkpoint(client_id: str) -> dict | None:
+    try:
+        with open(_checkpoint_path(client_id), encoding="utf-8") as f:
+            cp = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cp if cp.get("account") == _token_fingerprint() else None
+
+
+def _save_checkpoint(client_id: str, sync_token: str, known: dict) -> None:
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    path = _checkpoint_path(client_id)
+    cp = {
+        "account": _token_fingerprint(),
+        "sync_token": sync_token,
+        "synced_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),  # for display only
+        "known": {kind: sorted(ids) for kind, ids in known.items()},
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(cp, f)
+    os.replace(path + ".tmp", path)
+
+
+def _sync_read(sync_token: str, resource_types: list, meta: dict):
+    """
+    Read-only Sync API request (no commands), so it does not go through the outbox.
+    Yields (resource_type, object) while the payload streams in; sync_token,
+    full_sync etc. are in `meta` once the generator is exhausted.
+    """
+    full_sync = sync_token == "*"
+    start = time.perf_counter()
+    with _span("POST /sync", kind="CLIENT", **{"http.request.method": "POST", "todoist.full_sync": full_sync}):
+        try:
+            res = requests.post(
+                f"{BASE_URL}/sync",
+                headers=_headers(),
+                json={"sync_token": sync_token, "resource_types": resource_types},
+                # A full sync returns the whole account; timeouts learned from command batches don't apply.
+                timeout=REQUEST_TIMEOUT if full_sync else _timeout_for("POST /sync"),
+                stream=True,
+            )
+        finally:
+            if not full_sync:
+                _record_latency("POST /sync", "upstream", time.perf_counter() - start)
+    with contextlib.closing(res):
+        res.raise_for_status()
+        yield from _iter_json_arrays(res.iter_content(STREAM_CHUNK), set(resource_types), meta)
+
+
+def _classify_change(obj: dict, known: set) -> str:
+    """Bucket a changed sync object as added / updated / completed / deleted."""
+    if obj.get("is_deleted"):
+        return "deleted"
+    if obj.get("checked") or obj.get("is_archived"):
+        return "completed"
+    return "updated" if str(obj.get("id")) in known else "added"
+
+
+def _track_id(known: set, obj: dict) -> None:
+    """Keep the set of existing IDs current (completed objects stay — they can be reopened)."""
+    if obj.get("is_deleted"):
+        known.discard(str(obj.get("id")))
+    else:
+        known.add(str(obj.get("id")))
+
+
+def _fmt_change(kind: str, obj: dict) -> str:
+    if kind == "items":
+        return f"[{obj.get('id')}] {obj.get('content', '')}" + (f"  (project {obj['project_id']})" if obj.get("project_id") else "")
+    if kind == "projects":
+        return f"[{obj.get('id')}] {obj.get('name', '')}"
+    target = obj.get("item_id") or obj.get("task_id") or obj.get("project_id")
+    return f"[{obj.get('id')}] on {target}: {obj.get('content', '')}"
+
+
+@_tool()
+def get_changes_since(client_id: str = "default", limit: int = 50, reset: bool = False) -> str:
+    """
+    Return only the tasks, projects and comments that were added, updated, completed
+    or deleted since this client's last call — much cheaper than re-reading all tasks.
+    The first call (or reset=true) just records a checkpoint.
+
+    Args:
+        client_id: Name of the checkpoint to use; use a different one per agent or purpose.
+        limit: Maximum number of changes listed per category. Default is 50.
+        reset: If true, discard the old checkpoint and start a new one from now.
+    """
+    limit = max(limit, 1)
+    try:
+        cp = None if reset else _load_checkpoint(client_id)
+        meta: dict = {}
+        known = {kind: set() for kind in CHANGE_RESOURCES}
+        # No checkpoint, or one that does not track IDs for every resource type yet.
+        if cp is None or not set(CHANGE_RESOURCES) <= set(cp.get("known", {})):
+            counts = collections.Counter()
+            for kind, obj in _sync_read("*", CHANGE_RESOURCES, meta):
+                counts[kind] += 1
+                _track_id(known[kind], obj)
+            _save_checkpoint(client_id, meta["sync_token"], known)
+            return (
+                f"📍 Checkpoint created for '{client_id}' "
+                f"({counts['items']} active tasks, {counts['projects']} projects). "
+                f"Call again later to see what changed."
+            )
+        since = cp["synced_at"]
+        current = {kind: set(cp["known"].get(kind, [])) for kind in CHANGE_RESOURCES}
+        # Classify while the delta streams in; only the first `limit` objects per group are kept.
+        counts = collections.Counter()
+        shown: dict = {}
+        for kind, obj in _sync_read(cp["sync_token"], CHANGE_RESOURCES, meta):
+            group = (CHANGE_TITLES[kind], _classify_change(obj, current[kind]))
+            counts[group] += 1
+            if counts[group] <= limit:
+                shown.setdefault(group, []).append(_fmt_change(kind, obj))
+            _track_id(current[kind], obj)
+            _track_id(known[kind], obj)  # only used if this turns out to be a full sync
+        if meta.get("full_sync"):
+            # Todoist expired the token and sent everything — we cannot tell what changed.
+            _save_checkpoint(client_id, meta["sync_token"], known)
+            return f"⚠️ Checkpoint for '{client_id}' expired; a new one was created. Call again later to see changes."
+        lines = []
+        marks = {"added": "+", "updated": "~", "completed": "✓", "deleted": "−"}
+        for title in dict.fromkeys(CHANGE_TITLES.values()):
+            changes = [c for c in marks if counts[(title, c)]]
+            if not changes:
+                continue
+            lines.append(f"{title}: " + ", ".join(f"{counts[(title, c)]} {c}" for c in changes))
+            for change in changes:
+                lines.extend(f"  {marks[change]} {line}" for line in shown[(title, change)])
+                if counts[(title, change)] > limit:
+                    lines.append(f"  … {counts[(title, change)] - limit} more {change}")
+        _save_checkpoint(client_id, meta["sync_token"], current)
+        if not lines:
+            return f"No changes since {since} (client '{client_id}')."
+        return f"🔄 Changes since {since} (client '{client_id}'):\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error getting changes: {e}"
+
+
 # ═══════════════════════════════════════════════
 #  Configuration (API Token)
 # ═══════════════════════════════════════════════
 
-@mcp.tool()
+@_tool()
 def set_api_token(token: str) -> str:
     """
     Set or update the Todoist API Token at runtime.
@@ -750,33 +2917,70 @@ def set_api_token(token: str) -> str:
     if not re.match(r'^[a-fA-F0-9]+$', token):
         return "❌ Invalid token format. Todoist API tokens should be hexadecimal strings."
     os.environ["TODOIST_API_TOKEN"] = token
+    _reset_account_caches()
     # Verify the token works
     try:
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-        res = requests.get(f"{BASE_URL}/projects", headers=headers, timeout=REQUEST_TIMEOUT)
+        res = _get("/projects", headers=headers)
         res.raise_for_status()
-        projects = _extract_results(res.json())
+        data = _json(res)
+        projects = _extract_results(data)
+        _projects_index.refresh(data, projects)
         return f"✅ API Token set successfully! Found {len(projects)} projects. Token is active for this session."
     except Exception as e:
         os.environ.pop("TODOIST_API_TOKEN", None)
         return f"❌ Token verification failed. Token was not saved."
 
 
-@mcp.tool()
+@_tool()
+def flush_outbox() -> str:
+    """
+    Retry writes that could not be delivered earlier (e.g. after a network failure).
+    Queued writes keep their idempotency key, so replaying never creates duplicates.
+    """
+    try:
+        with _replaying:  # let a background replay finish rather than report its writes as stuck
+            delivered, pending = _replay_outbox()
+        rejected = _outbox_take_rejected()
+        if not delivered and not pending and not rejected and not _outbox_pending():
+            return "✅ Outbox is empty — all writes have been delivered."
+        held = len(_outbox_pending()) - pending
+        note = f"\nℹ️ {held} queued write(s) belong to another API token and are kept until it is active again." if held else ""
+        if rejected:
+            lines = "\n".join(f"  • {op['method']} {op['path']} → {op['status']}" for op in rejected)
+            note = f"\n❌ Todoist rejected {len(rejected)} queued write(s); they were not applied:\n{lines}{note}"
+        if pending:
+            return f"⚠️ Delivered {delivered} queued write(s); {pending} still pending (network unavailable?).{note}"
+        if rejected:
+            return f"⚠️ Delivered {delivered} queued write(s).{note}"
+        if not delivered:
+            return f"✅ No queued writes for this account.{note}"
+        return f"✅ Delivered {delivered} queued write(s).{note}"
+    except Exception as e:
+        return f"Error flushing outbox: {e}"
+
+
+@_tool()
 def get_current_config() -> str:
     """
     Show the current configuration status (whether API token is set, API base URL, etc).
     """
     token = os.environ.get("TODOIST_API_TOKEN", "")
     token_status = f"✅ Set (ending in ...{token[-4:]})" if len(token) >= 4 else ("⚠️ Set (too short)" if token else "❌ Not set")
+    queued = _outbox_pending()
+    account = _token_fingerprint() if token else ""
+    held = sum(1 for op in queued if op.get("account") != account)
     return (
         f"🔧 Todoist MCP Configuration\n"
         f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
         f"  API Token:  {token_status}\n"
         f"  API URL:    {BASE_URL}\n"
+        f"  Outbox:     {len(queued) - held} pending write(s){f' (+{held} for another token)' if held else ''} in {OUTBOX_DIR}\n"
+        f"  Tracing:    {f'off ({_trace_error})' if _trace_error else TRACE_FILE or 'off'}\n"
+        f"  Profiling:  {f'every {PROFILE_EVERY} call(s) → {PROFILE_DIR}' if PROFILE_EVERY > 0 else 'off'}\n"
         f"  Get token:  https://app.todoist.com/app/settings/integrations"
     )
 
@@ -785,9 +2989,34 @@ def get_current_config() -> str:
 #  Entry point
 # ═══════════════════════════════════════════════
 
+def _replay_on_startup() -> None:
+    try:
+        _replay_outbox()
+    except Exception:
+        pass  # best effort — the next write or flush_outbox retries again
+
+
 def main():
+    threading.Thread(target=_replay_on_startup, daemon=True).start()
     mcp.run()
 
 
+def backup_main(argv: list | None = None):
+    """Command-line export/import: todoist-mcp-backup export [FILE] | import FILE"""
+    parser = argparse.ArgumentParser(prog="todoist-mcp-backup", description="Export or import a Todoist account.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help="stream the account to a .jsonl.gz file").add_argument("file", nargs="?", default="")
+    sub.add_parser("import", help="replay a .jsonl.gz export into the account").add_argument("file")
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "export":
+            print(_run_export(args.file or os.path.join(EXPORT_DIR, f"todoist-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz")))
+        else:
+            print(_run_import(args.file))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
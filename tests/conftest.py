@@ -0,0 +1,48 @@
+"""
+Shared fixtures: a local fake Todoist API (load_test.FakeTodoist) with the
+server pointed at it and its state kept in a temporary directory.
+"""
+import os
+import sys
+
+import pytest
+
+# Allow running directly from the repo root
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
+
+from load_test import FakeTodoist, serve
+from todoist_mcp import server
+
+TOKEN = "a" * 40
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    fake = FakeTodoist(tasks=0, latency=0)
+    httpd = serve(fake)
+    fake.url = f"http://127.0.0.1:{httpd.server_port}/api/v1"
+    monkeypatch.setenv("TODOIST_API_TOKEN", TOKEN)
+    monkeypatch.setattr(server, "BASE_URL", fake.url)
+    monkeypatch.setattr(server, "OUTBOX_DIR", str(tmp_path / "outbox"))
+    monkeypatch.setattr(server, "RETRY_BACKOFF", 0)
+    server._reset_account_caches()
+    yield fake
+    with server._replaying:  # let a background replay finish before the fake goes away
+        pass
+    httpd.shutdown()
+    server._reset_account_caches()
+
+
+def fail_requests(fake: FakeTodoist, path: str, status: int, times: int) -> None:
+    """Make the next `times` requests to `path` fail with `status`."""
+    handle, left = fake.handle, [times]
+
+    def failing(method, req_path, query, body):
+        if req_path == path and left[0]:
+            left[0] -= 1
+            return status, None
+        return handle(method, req_path, query, body)
+
+    fake.handle = failing
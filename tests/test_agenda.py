@@ -0,0 +1,66 @@
+"""
+Tests for the agenda index: which writes update it in place, which drop it,
+and which timezone it buckets in by default.
+Usage: python -m pytest tests
+"""
+import datetime
+import zoneinfo
+
+from todoist_mcp import server
+
+
+def _crawls(fake) -> int:
+    return fake.requests["GET /tasks"]
+
+
+def test_unrelated_writes_keep_the_index(fake):
+    server.get_agenda("all")
+    crawls = _crawls(fake)
+    server.create_label("errands")
+    server.create_comment("note", project_id="p1")
+    server.create_project("New")
+    server.get_agenda("all")
+    assert _crawls(fake) == crawls
+
+
+def test_created_and_updated_tasks_are_applied_in_place(fake):
+    server.get_agenda("today", timezone="UTC")
+    crawls = _crawls(fake)
+    created = server.create_task("water plants", due_string="today")
+    task_id = created.split("(ID: ")[1].split(")")[0]
+    assert "water plants" in server.get_agenda("today", timezone="UTC")
+
+    server.update_task(task_id, content="water the plants")
+    agenda = server.get_agenda("today", timezone="UTC")
+    assert "water the plants" in agenda and "water plants\n" not in agenda
+    assert _crawls(fake) == crawls
+
+
+def test_closing_a_task_drops_the_index(fake):
+    server.create_task("pay rent", due_string="today")
+    task_id = next(iter(fake.tasks))
+    server.get_agenda("today", timezone="UTC")
+    crawls = _crawls(fake)
+    server.close_task(task_id)
+    assert "pay rent" not in server.get_agenda("today", timezone="UTC")
+    assert _crawls(fake) == crawls + 1
+
+
+def test_queued_task_write_drops_the_index(fake, monkeypatch):
+    server.get_agenda("today", timezone="UTC")
+    monkeypatch.setattr(server, "BASE_URL", "http://127.0.0.1:1/api/v1")
+    assert server.create_task("call mum", due_string="today").startswith("⏳ Queued")
+    assert server._agenda_index is None
+
+
+def test_default_timezone_is_the_accounts(fake):
+    fake.timezone = "America/New_York"
+    tz = server._resolve_tz("")
+    assert tz == zoneinfo.ZoneInfo("America/New_York")
+    # Floating due times on either side of the DST change get their own offsets.
+    before = server._parse_due_moment("2026-10-30T09:00:00", tz)
+    after = server._parse_due_moment("2026-11-02T09:00:00", tz)
+    assert before.utcoffset() == datetime.timedelta(hours=-4)
+    assert after.utcoffset() == datetime.timedelta(hours=-5)
+    server._resolve_tz("")
+    assert fake.requests["POST /sync"] == 1  # looked up once per token
@@ -0,0 +1,97 @@
+"""
+Tests for the change feed: classifying a Sync delta into added / updated /
+completed / deleted, expired sync tokens and checkpoints from older versions.
+Usage: python -m pytest tests
+"""
+import json
+
+import pytest
+
+from todoist_mcp import server
+
+
+@pytest.fixture(autouse=True)
+def checkpoints(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+
+
+def _seed(fake, *contents) -> None:
+    for content in contents:
+        fake._add_task({"content": content})
+
+
+def test_first_call_creates_a_checkpoint(fake):
+    _seed(fake, "alpha", "beta")
+    assert server.get_changes_since("agent").startswith("📍 Checkpoint created for 'agent' (2 active tasks")
+    assert server.get_changes_since("agent").startswith("No changes since")
+
+
+def test_changes_are_classified(fake):
+    _seed(fake, "alpha", "beta", "gamma")
+    server.get_changes_since("agent")
+
+    fake._add_task({"content": "delta"})
+    fake.handle("POST", "/tasks/t0", {}, {"content": "alpha v2"})
+    fake.handle("POST", "/tasks/t1/close", {}, {})
+    fake.handle("DELETE", "/tasks/t2", {}, {})
+    report = server.get_changes_since("agent")
+    assert report.startswith("🔄 Changes since")
+    assert "Tasks: 1 added, 1 updated, 1 completed, 1 deleted" in report
+    assert "  + [t3] delta" in report
+    assert "  ~ [t0] alpha v2" in report
+    assert "  ✓ [t1] beta" in report
+    assert "  − [t2] gamma" in report
+
+    # The checkpoint moved on: the same changes are not reported twice.
+    assert server.get_changes_since("agent").startswith("No changes since")
+    fake.handle("POST", "/tasks/t3", {}, {"content": "delta v2"})
+    assert "Tasks: 1 updated" in server.get_changes_since("agent")  # t3 is known now
+
+
+def test_limit_and_comments(fake):
+    _seed(fake, "alpha")
+    server.get_changes_since("agent")
+    _seed(fake, "beta", "gamma", "delta")
+    fake.handle("POST", "/sync", {}, {"commands": [
+        {"type": "note_add", "uuid": "u1", "temp_id": "n1", "args": {"item_id": "t0", "content": "looks good"}}]})
+    report = server.get_changes_since("agent", limit=2)
+    assert "Tasks: 3 added" in report
+    assert "  … 1 more added" in report
+    assert "Comments: 1 added" in report
+
+
+def test_expired_token_starts_a_new_checkpoint(fake):
+    _seed(fake, "alpha")
+    server.get_changes_since("agent")
+    _seed(fake, "beta")
+    fake.oldest_token = fake.version  # Todoist no longer accepts the saved token
+
+    assert server.get_changes_since("agent").startswith("⚠️ Checkpoint for 'agent' expired")
+    assert server.get_changes_since("agent").startswith("No changes since")
+    fake.handle("POST", "/tasks/t1", {}, {"content": "beta v2"})
+    assert "Tasks: 1 updated" in server.get_changes_since("agent")  # IDs from the full sync were kept
+
+
+def test_checkpoint_without_ids_for_every_resource_is_recreated(fake):
+    _seed(fake, "alpha")
+    server.get_changes_since("agent")
+    path = server._checkpoint_path("agent")
+    with open(path, encoding="utf-8") as f:
+        cp = json.load(f)
+    cp["known"] = {"items": cp["known"]["items"]}  # written before comments were tracked
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cp, f)
+
+    assert server.get_changes_since("agent").startswith("📍 Checkpoint created for 'agent'")
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)["known"]) == set(server.CHANGE_RESOURCES)
+
+
+def test_checkpoints_are_kept_per_client(fake):
+    _seed(fake, "alpha")
+    server.get_changes_since("a")
+    _seed(fake, "beta")
+    server.get_changes_since("b")
+    fake._add_task({"content": "gamma"})
+    assert "Tasks: 2 added" in server.get_changes_since("a")
+    assert "Tasks: 1 added" in server.get_changes_since("b")
@@ -0,0 +1,19 @@
+"""
+Tests for near-duplicate warnings on create_task.
+Usage: python -m pytest tests
+"""
+from todoist_mcp import server
+
+
+def test_warn_duplicates_creates_the_task_and_lists_matches(fake):
+    server.create_task("Book dentist appointment", project_id="p1")
+    result = server.create_task("book dentist appointment!", project_id="p1", warn_duplicates=True)
+    assert result.startswith("✅ Task created")
+    assert "1 similar task(s) already exist" in result
+    assert len(fake.tasks) == 2
+
+
+def test_warn_duplicates_is_quiet_without_matches(fake):
+    server.create_task("Book dentist appointment", project_id="p1")
+    result = server.create_task("Renew passport", project_id="p1", warn_duplicates=True)
+    assert result.startswith("✅ Task created") and "similar" not in result
@@ -0,0 +1,119 @@
+"""
+Tests for account export and import: comments read in one request, no partial
+export left behind, and imports resuming after an interruption, after a batch
+left queued in the outbox, and after a batch Todoist refused — without duplicates.
+Usage: python -m pytest tests
+"""
+import os
+import collections
+
+import pytest
+import requests
+
+from conftest import fail_requests
+from todoist_mcp import server
+
+TASKS = 45
+
+
+@pytest.fixture
+def export(fake, tmp_path, monkeypatch):
+    """An export of an account with TASKS tasks (some nested), imported in batches of 20."""
+    monkeypatch.setattr(server, "SYNC_BATCH_SIZE", 20)
+    for i in range(TASKS):
+        fake._add_task({"content": f"task {i}", "project_id": f"p{i % 3}",
+                        "parent_id": f"t{i - 1}" if i % 5 else None})
+    path = str(tmp_path / "account.jsonl.gz")
+    server._export_account(path)
+    return path
+
+
+def _copies(fake) -> collections.Counter:
+    """How many times each exported task exists (1 = original only, 2 = imported once)."""
+    return collections.Counter(t["content"] for t in fake.tasks.values())
+
+
+def _interrupt_after(monkeypatch, records: int) -> None:
+    read = server._read_export
+
+    def interrupted(path):
+        monkeypatch.setattr(server, "_read_export", read)  # only the first import is interrupted
+        for i, rec in enumerate(read(path)):
+            if i == records:
+                raise KeyboardInterrupt
+            yield rec
+
+    monkeypatch.setattr(server, "_read_export", interrupted)
+
+
+def test_export_reads_all_comments_in_one_request(fake, tmp_path):
+    fake._add_task({"content": "alpha"})
+    fake.comments["c1"] = {"id": "c1", "task_id": "t0", "content": "on the task"}
+    fake.comments["c2"] = {"id": "c2", "project_id": "p1", "content": "on the project"}
+    counts = server._export_account(str(tmp_path / "account.jsonl.gz"))
+    assert counts["comment"] == 2
+    assert fake.requests["POST /sync"] == 1
+    assert not fake.requests["GET /comments"]
+    comments = sorted(d["content"] for kind, d in server._read_export(str(tmp_path / "account.jsonl.gz"))
+                      if kind == "comment")
+    assert comments == ["on the project", "on the task"]
+
+
+def test_failed_export_leaves_no_partial_file(fake, tmp_path):
+    fail_requests(fake, "/sync", 429, 1)
+    with pytest.raises(requests.HTTPError):
+        server._export_account(str(tmp_path / "account.jsonl.gz"))
+    assert os.listdir(tmp_path) == []
+
+
+def test_import_copies_the_account_once(fake, export):
+    assert server._run_import(export).startswith("✅ Imported")
+    assert set(_copies(fake).values()) == {2}
+    copies = list(fake.tasks.values())[TASKS:]
+    assert sum(1 for t in copies if t["parent_id"]) == TASKS - TASKS // 5
+    assert all(int(t["parent_id"][1:]) >= TASKS for t in copies if t["parent_id"])  # points at the copy
+
+
+def test_import_resumes_after_an_interruption(fake, export, monkeypatch):
+    _interrupt_after(monkeypatch, 50)
+    with pytest.raises(KeyboardInterrupt):
+        server._run_import(export)
+    assert os.path.exists(export + ".import")
+    assert sum(_copies(fake).values()) > TASKS  # some batches landed before the interruption
+
+    assert server._run_import(export).startswith("✅ Imported")
+    assert set(_copies(fake).values()) == {2}
+    assert not os.path.exists(export + ".import")
+
+
+def test_import_resumes_from_a_queued_batch_via_its_receipt(fake, export, monkeypatch):
+    monkeypatch.setattr(server, "RETRY_BACKOFF", 0)
+    fail_requests(fake, "/sync", 503, server.MUTATION_RETRIES)  # the first batch stays in the outbox
+    assert server._run_import(export).startswith("⚠️ Import paused")
+    assert len(server._outbox_pending()) == 1
+
+    # Resuming replays the queued batch and maps its records from the receipt.
+    assert server._run_import(export).startswith("✅ Imported")
+    assert server._outbox_pending() == []
+    assert set(_copies(fake).values()) == {2}
+
+
+def test_import_retries_a_refused_batch(fake, export):
+    fail_requests(fake, "/sync", 400, 1)
+    with pytest.raises(Exception, match="400"):
+        server._run_import(export)
+    assert set(_copies(fake).values()) == {1}
+
+    assert server._run_import(export).startswith("✅ Imported")
+    assert set(_copies(fake).values()) == {2}
+
+
+def test_queued_batch_refused_on_replay_is_reported_as_failed(fake, export, monkeypatch):
+    monkeypatch.setattr(server, "RETRY_BACKOFF", 0)
+    fail_requests(fake, "/sync", 503, server.MUTATION_RETRIES)
+    assert server._run_import(export).startswith("⚠️ Import paused")
+    fail_requests(fake, "/sync", 400, 1)
+
+    result = server._run_import(export)
+    assert result.startswith("✅ Imported")
+    assert "⚠️ 20 record(s) could not be imported." in result
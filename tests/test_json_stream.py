@@ -0,0 +1,102 @@
+"""
+Tests for the incremental JSON parser (_iter_json_arrays).
+Every payload is re-parsed with the body split at every possible byte offset,
+so numbers, escapes and multi-byte UTF-8 sequences all get cut mid-token.
+Usage: python -m pytest tests
+"""
+import os
+import sys
+import json
+
+import pytest
+
+# Allow running directly from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from todoist_mcp.server import _iter_json_arrays
+
+PAYLOADS = [
+    # A /tasks page: numbers of every shape, nulls, booleans, nested objects.
+    {
+        "results": [
+            {"id": "6X7", "priority": 4, "child_order": -12, "ratio": 12.5, "big": 12345678901234567890,
+             "exp": 1.5e-7, "neg_exp": -2E+10, "due": None, "checked": False, "labels": ["a", "b"]},
+            {"id": "6X8", "content": "nested", "due": {"date": "2026-10-20", "is_recurring": True}, "labels": []},
+            7,
+            0,
+            -0.25,
+        ],
+        "next_cursor": "abc",
+    },
+    # Escapes: quotes, backslashes, control characters, \u escapes and surrogate pairs.
+    {"results": ["say \"hi\"", "back\\slash\\", "tab\tnew\nline", "é会🎯", "/\\/"], "next_cursor": None},
+    # Multi-byte UTF-8 written raw (2-, 3- and 4-byte sequences).
+    {"results": [{"content": "café 会议 报告 🎯💼", "description": "ÄÖÜ ß ✓ 𝄞"}], "next_cursor": "末尾"},
+    # Sync-style payload: several arrays, scalars before and after them.
+    {"full_sync": True, "items": [{"id": 1}, {"id": 2, "v": [1, [2, [3]]]}], "sync_token": "tok",
+     "projects": [], "notes": [{"content": "x" * 50}], "temp_id_mapping": {}, "count": 3},
+    # Empty results.
+    {"results": [], "next_cursor": None},
+]
+
+
+def _expected(doc: dict, keys: set):
+    items = [(k, el) for k, v in doc.items() if k in keys and isinstance(v, list) for el in v]
+    meta = {k: v for k, v in doc.items() if not (k in keys and isinstance(v, list))}
+    return items, meta
+
+
+def _parse(chunks, keys):
+    meta: dict = {}
+    items = list(_iter_json_arrays(chunks, keys, meta))
+    return items, meta
+
+
+@pytest.mark.parametrize("doc", PAYLOADS)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_split_point(doc, indent):
+    raw = json.dumps(doc, ensure_ascii=False, indent=indent).encode()
+    keys = {"results", "items", "projects", "notes"}
+    expected = _expected(doc, keys)
+    for cut in range(len(raw) + 1):
+        assert _parse([raw[:cut], raw[cut:]], keys) == expected, f"split at byte {cut}"
+
+
+@pytest.mark.parametrize("doc", PAYLOADS)
+def test_one_byte_chunks(doc):
+    raw = json.dumps(doc, ensure_ascii=False).encode()
+    keys = {"results", "items", "projects", "notes"}
+    assert _parse([raw[i:i + 1] for i in range(len(raw))], keys) == _expected(doc, keys)
+
+
+def test_ascii_escaped_payload():
+    doc = PAYLOADS[2]
+    raw = json.dumps(doc, ensure_ascii=True).encode()
+    for cut in range(len(raw) + 1):
+        assert _parse([raw[:cut], raw[cut:]], {"results"}) == _expected(doc, {"results"})
+
+
+def test_unlisted_arrays_go_to_meta():
+    raw = b'{"results": [1, 2], "other": [3, 4]}'
+    assert _parse([raw], {"results"}) == ([("results", 1), ("results", 2)], {"other": [3, 4]})
+
+
+def test_bare_top_level_array():
+    raw = b'[{"id": 1}, 2.5, "x"]'
+    for cut in range(len(raw) + 1):
+        assert _parse([raw[:cut], raw[cut:]], set()) == ([(None, {"id": 1}), (None, 2.5), (None, "x")], {})
+
+
+def test_items_are_yielded_before_the_body_ends():
+    def chunks():
+        yield b'{"results": [{"id": 1}, '
+        raise AssertionError("read past the first element")
+
+    gen = _iter_json_arrays(chunks(), {"results"}, {})
+    assert next(gen) == ("results", {"id": 1})
+
+
+@pytest.mark.parametrize("raw", [b'{"results": [1, 2', b'{"results": [{"id": 1', b'{"a": tru', b'"text"'])
+def test_truncated_or_invalid_body_raises(raw):
+    with pytest.raises(ValueError):
+        _parse([raw], {"results"})
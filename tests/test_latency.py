@@ -0,0 +1,62 @@
+"""
+Tests for adaptive timeouts: latency windows are kept per method and path,
+and a GET that outlives its learned timeout is retried instead of failing.
+Usage: python -m pytest tests
+"""
+import pytest
+
+from todoist_mcp import server
+
+
+@pytest.fixture(autouse=True)
+def fresh_latency(monkeypatch):
+    monkeypatch.setattr(server, "_latency", {})
+
+
+def test_slow_read_after_fast_ones_is_retried_not_failed(fake, monkeypatch):
+    monkeypatch.setattr(server, "MIN_TIMEOUT", 0.2)
+    for _ in range(server.LATENCY_MIN_SAMPLES + 5):
+        server.list_projects()
+    assert server._timeout_for("GET /projects") == 0.2
+
+    fake.latency = 0.5
+    assert server.list_projects().startswith("- Inbox")
+    assert fake.requests["GET /projects"] == server.LATENCY_MIN_SAMPLES + 7
+
+
+def test_latency_is_kept_per_method(fake):
+    server.create_task("alpha")
+    server.get_tasks()
+    assert {"POST /tasks", "GET /tasks"} <= set(server._latency)
+
+
+def test_full_sync_does_not_feed_the_command_window(fake):
+    list(server._sync_read("*", ["items"], {}))
+    assert "POST /sync" not in server._latency
+    list(server._sync_read("token", ["items"], {}))
+    assert len(server._latency["POST /sync"]["upstream"]) == 1
+
+
+def test_slow_write_after_fast_ones_is_retried_with_the_full_timeout(fake, monkeypatch):
+    monkeypatch.setattr(server, "MIN_TIMEOUT", 0.2)
+    server.create_task("v0")
+    for i in range(server.LATENCY_MIN_SAMPLES + 5):
+        server.update_task("t0", content=f"v{i}")
+    assert server._timeout_for("POST /tasks/{id}") == 0.2
+
+    fake.latency = 0.5
+    assert server.update_task("t0", content="slow").startswith("✅ Task updated")
+    assert fake.requests["POST /tasks/{id}"] == server.LATENCY_MIN_SAMPLES + 7  # timed out once, then delivered
+    assert server._outbox_pending() == []
+
+
+def test_command_batches_get_the_full_timeout_and_their_own_window(fake, monkeypatch):
+    monkeypatch.setattr(server, "MIN_TIMEOUT", 0.2)
+    for _ in range(server.LATENCY_MIN_SAMPLES + 5):
+        list(server._sync_read("token", ["items"], {}))
+    assert server._timeout_for("POST /sync") == 0.2
+
+    fake.latency = 0.5
+    server._sync_commands([{"type": "label_add", "uuid": "u1", "temp_id": "t1", "args": {"name": "slow"}}])
+    assert fake.requests["POST /sync"] == server.LATENCY_MIN_SAMPLES + 6
+    assert len(server._latency["POST /sync commands"]["upstream"]) == 1
@@ -0,0 +1,40 @@
+"""
+Tests for name → ID resolution in the write and filter tools: only exact
+names (or IDs) are applied; prefixes and near misses are suggested, never acted on.
+Usage: python -m pytest tests
+"""
+from todoist_mcp import server
+
+
+def test_exact_names_and_ids_resolve(fake):
+    assert server.create_task("a", project="project 3").startswith("✅ Task created")
+    assert server.create_task("b", project="📥 INBOX").startswith("✅ Task created")
+    assert server.create_task("c", project="p5").startswith("✅ Task created")
+    assert [t["project_id"] for t in fake.tasks.values()] == ["p3", "inbox", "p5"]
+
+
+def test_prefix_is_suggested_not_applied(fake):
+    fake.projects = {"w": {"id": "w", "name": "Workout"}}
+    result = server.create_task("quarterly report", project="Work")
+    assert result == "Error creating task: no project 'Work'; did you mean 'Workout'?"
+    assert fake.tasks == {}
+
+
+def test_near_miss_is_suggested_not_applied(fake):
+    result = server.create_task("x", project="Inbox 2")
+    assert result == "Error creating task: no project 'Inbox 2'; did you mean 'Inbox'?"
+    assert fake.tasks == {}
+
+
+def test_filter_by_unknown_project_does_not_fall_back(fake):
+    server.create_task("in project 1", project_id="p1")
+    result = server.get_tasks(project="Project 11")
+    assert "no project 'Project 11'" in result
+    assert "in project 1" not in result
+
+
+def test_duplicate_names_are_reported(fake):
+    fake.projects["p9"]["name"] = "Project 1"
+    result = server.create_task("x", project="Project 1")
+    assert "'Project 1' matches several projects" in result
+    assert fake.tasks == {}
@@ -0,0 +1,142 @@
+"""
+Tests for the durable outbox: queued writes, replay, rejected writes, account
+scoping and several server processes sharing one state directory.
+Usage: python -m pytest tests
+"""
+import os
+import sys
+import time
+import threading
+import subprocess
+
+from conftest import ROOT, TOKEN as TOKEN_A
+from load_test import FakeTodoist
+from todoist_mcp import server
+
+TOKEN_B = "b" * 40
+OFFLINE_URL = "http://127.0.0.1:1/api/v1"  # nothing listens on port 1: connection refused
+
+
+def _contents(fake: FakeTodoist) -> list:
+    return sorted(t["content"] for t in fake.tasks.values())
+
+
+def test_queued_write_is_delivered_by_flush(fake, monkeypatch):
+    monkeypatch.setattr(server, "BASE_URL", OFFLINE_URL)
+    assert server.create_task("alpha").startswith("⏳ Queued")
+    assert len(server._outbox_pending()) == 1
+
+    monkeypatch.setattr(server, "BASE_URL", fake.url)
+    assert "Delivered 1 queued write" in server.flush_outbox()
+    assert _contents(fake) == ["alpha"]
+    assert server._outbox_pending() == []
+    assert fake.requests["POST /tasks"] == 1
+
+
+def _wait_for(condition, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_write_waits_behind_older_writes_to_the_same_task(fake, monkeypatch):
+    server.create_task("alpha")
+    monkeypatch.setattr(server, "BASE_URL", OFFLINE_URL)
+    assert server.update_task("t0", content="first").startswith("⏳ Queued")
+
+    monkeypatch.setattr(server, "BASE_URL", fake.url)
+    assert server.update_task("t0", content="second").startswith("✅ Task updated")
+    assert fake.tasks["t0"]["content"] == "second"
+    assert fake.requests["POST /tasks/{id}"] == 2
+    assert server._outbox_pending() == []
+
+
+def test_unrelated_write_does_not_wait_and_drains_the_queue(fake, monkeypatch):
+    monkeypatch.setattr(server, "BASE_URL", OFFLINE_URL)
+    server.create_task("alpha")
+
+    monkeypatch.setattr(server, "BASE_URL", fake.url)
+    assert server.create_task("beta").startswith("✅ Task created")
+    _wait_for(lambda: len(fake.tasks) == 2)  # alpha is replayed in the background
+    assert _contents(fake) == ["alpha", "beta"]
+    _wait_for(lambda: server._outbox_pending() == [])
+
+
+def test_concurrent_writes_are_not_serialized(fake):
+    fake.latency = 0.3
+    start = time.monotonic()
+    threads = [threading.Thread(target=server.create_task, args=(f"task {i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(fake.tasks) == 8
+    assert time.monotonic() - start < 1.2  # one after another would take 2.4 s
+
+
+def test_write_abandoned_by_a_dead_process_is_replayed(fake, monkeypatch):
+    monkeypatch.setattr(server, "BASE_URL", OFFLINE_URL)
+    server.create_task("alpha")
+    (op,) = server._outbox_pending()
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    os.rename(server._outbox_path(op), server._outbox_path(op, dead.pid))
+
+    monkeypatch.setattr(server, "BASE_URL", fake.url)
+    assert "Delivered 1 queued write" in server.flush_outbox()
+    assert _contents(fake) == ["alpha"]
+
+
+def test_rejected_replay_is_set_aside_and_reported(fake, monkeypatch):
+    monkeypatch.setattr(server, "BASE_URL", OFFLINE_URL)
+    assert server.update_task("t999", content="gone").startswith("⏳ Queued")
+
+    monkeypatch.setattr(server, "BASE_URL", fake.url)
+    assert server._replay_outbox() == (0, 0)
+    assert server._outbox_pending() == []
+    assert len(os.listdir(os.path.join(server.OUTBOX_DIR, "rejected"))) == 1
+
+    report = server.flush_outbox()
+    assert "Todoist rejected 1 queued write" in report
+    assert "POST /tasks/t999 → 404" in report
+    assert os.listdir(os.path.join(server.OUTBOX_DIR, "rejected")) == []
+
+
+def test_other_accounts_writes_are_held_back(fake, monkeypatch):
+    monkeypatch.setattr(server, "BASE_URL", OFFLINE_URL)
+    server.create_task("alpha")
+
+    monkeypatch.setattr(server, "BASE_URL", fake.url)
+    monkeypatch.setenv("TODOIST_API_TOKEN", TOKEN_B)
+    report = server.flush_outbox()
+    assert "1 queued write(s) belong to another API token" in report
+    assert server.create_task("beta").startswith("✅ Task created")
+    assert _contents(fake) == ["beta"]
+
+    monkeypatch.setenv("TODOIST_API_TOKEN", TOKEN_A)
+    assert "Delivered 1 queued write" in server.flush_outbox()
+    assert _contents(fake) == ["alpha", "beta"]
+
+
+def test_processes_sharing_the_outbox_do_not_resend_in_flight_writes(fake, tmp_path):
+    fake.latency = 1.0
+    env = dict(os.environ, TODOIST_MCP_STATE_DIR=str(tmp_path), TODOIST_API_BASE_URL=fake.url)
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1]); "
+        "from todoist_mcp import server; print(server.create_task('alpha'))"
+    )
+    other = subprocess.Popen([sys.executable, "-c", script, os.path.join(ROOT, "src")], env=env,
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        deadline = time.monotonic() + 30
+        while not fake.requests["POST /tasks"]:
+            assert other.poll() is None and time.monotonic() < deadline, "other process never sent its write"
+            time.sleep(0.01)
+        # The other process's write is now in flight and still on disk in the outbox.
+        assert server.create_task("beta").startswith("✅ Task created")
+        assert other.communicate(timeout=30)[0].startswith("✅ Task created")
+    finally:
+        other.kill()
+    assert fake.requests["POST /tasks"] == 2
+    assert _contents(fake) == ["alpha", "beta"]
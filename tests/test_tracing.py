@@ -0,0 +1,40 @@
+"""
+Tests for tool-call tracing spans: failed tool results mark the span as ERROR.
+Usage: python -m pytest tests
+"""
+import json
+
+import pytest
+
+from todoist_mcp import server
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(server, "TRACE_FILE", str(path))
+    monkeypatch.setattr(server, "_trace_out", None)
+    monkeypatch.setattr(server, "_trace_error", "")
+    yield path
+    if server._trace_out is not None:
+        server._trace_out.close()
+
+
+def _tool_spans(path) -> dict:
+    spans = [json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"][0] for line in path.read_text().splitlines()]
+    return {s["name"]: s for s in spans if s["name"].startswith("tool ")}
+
+
+@pytest.mark.parametrize("call, name", [
+    (lambda: server.complete_task_by_name("no such task"), "tool complete_task_by_name"),
+    (lambda: server.update_task("t999", content="x"), "tool update_task"),
+])
+def test_failed_tool_results_are_error_spans(fake, trace_file, call, name):
+    result = call()
+    span = _tool_spans(trace_file)[name]
+    assert span["status"] == {"code": 2, "message": result.split("\n", 1)[0]}
+
+
+def test_successful_tool_results_are_ok_spans(fake, trace_file):
+    server.list_projects()
+    assert _tool_spans(trace_file)["tool list_projects"]["status"] == {"code": 1}
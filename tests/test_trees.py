@@ -0,0 +1,84 @@
+"""
+Tests for the sub-task tree tools: reading, closing (in batches), moving and
+deleting a task with all of its subtasks.
+Usage: python -m pytest tests
+"""
+import pytest
+
+from conftest import fail_requests
+from todoist_mcp import server
+
+
+def _tree(fake, children: int, grandchildren: int = 0) -> str:
+    """Build root t0 with `children` subtasks; the first child gets `grandchildren` of its own."""
+    root = fake._add_task({"content": "root", "project_id": "p1"})
+    first = None
+    for i in range(children):
+        child = fake._add_task({"content": f"child {i}", "project_id": "p1", "parent_id": root["id"]})
+        first = first or child
+    for i in range(grandchildren):
+        fake._add_task({"content": f"grandchild {i}", "project_id": "p1", "parent_id": first["id"]})
+    fake._add_task({"content": "unrelated", "project_id": "p1"})
+    return root["id"]
+
+
+def test_get_task_tree_lists_descendants_in_order(fake):
+    root = _tree(fake, 2, grandchildren=1)
+    result = server.get_task_tree(root)
+    assert result.startswith("🌳 Task tree (3 subtask(s))")
+    assert result.index("child 0") < result.index("grandchild 0") < result.index("child 1")
+    assert "unrelated" not in result
+
+
+def test_close_task_tree_sends_one_batch_per_100_tasks(fake):
+    root = _tree(fake, 150)
+    assert server.close_task_tree(root) == "✅ Completed 'root' and 150 subtask(s)."
+    assert fake.requests["POST /sync"] == 2
+    assert [t["content"] for t in fake.tasks.values()] == ["unrelated"]
+
+
+def test_close_task_tree_keeps_going_when_a_batch_is_queued(fake, monkeypatch):
+    monkeypatch.setattr(server, "RETRY_BACKOFF", 0)
+    root = _tree(fake, 150)
+    fail_requests(fake, "/sync", 503, server.MUTATION_RETRIES)  # every attempt at the first batch fails
+    result = server.close_task_tree(root)
+    assert result.startswith("⏳ Completed 51 of 151 task(s)")
+    assert "100 more are queued in 1 batch(es)" in result
+    assert root not in fake.tasks  # the root, in the last batch, was still sent
+
+    server.flush_outbox()  # the queued batch is delivered, by this or the background replay
+    assert server._outbox_pending() == []
+    assert fake.requests["POST /sync"] == server.MUTATION_RETRIES + 2
+    assert [t["content"] for t in fake.tasks.values()] == ["unrelated"]
+
+
+def test_delete_task_tree(fake):
+    root = _tree(fake, 3, grandchildren=2)
+    assert server.delete_task_tree(root) == "✅ Deleted 'root' and 5 subtask(s)."
+    assert fake.requests["POST /sync"] == 1
+    assert [t["content"] for t in fake.tasks.values()] == ["unrelated"]
+
+
+@pytest.mark.parametrize("dest, expected", [
+    ({"project": "Project 2"}, ("project_id", "p2")),
+    ({"section": "Section 2"}, ("section_id", "s2")),
+    ({"project": "Project 3", "section": "Section 13"}, ("section_id", "s13")),
+    ({"parent_id": "t9"}, ("parent_id", "t9")),
+])
+def test_move_task_tree(fake, dest, expected):
+    root = _tree(fake, 2)
+    assert server.move_task_tree(root, **dest).startswith(f"✅ Moved task {root}")
+    assert fake.tasks[root][expected[0]] == expected[1]
+    assert fake.requests["POST /sync"] == 1
+
+
+@pytest.mark.parametrize("dest, error", [
+    ({}, "Error: provide a destination (project, section or parent)."),
+    ({"project_id": "p2", "parent_id": "t9"}, "Error: provide exactly one destination, got parent, project."),
+    ({"section_id": "s2", "project": "Project 2"}, "Error: provide exactly one destination, got section, project."),
+    ({"section": "Section 2", "parent_id": "t9"}, "Error: provide exactly one destination, got section, parent."),
+])
+def test_move_task_tree_rejects_conflicting_destinations(fake, dest, error):
+    root = _tree(fake, 1)
+    assert server.move_task_tree(root, **dest) == error
+    assert fake.requests["POST /sync"] == 0